@@ -3,15 +3,26 @@ import os
 import json
 from typing import List, Dict
 import time
+import atexit
 import pandas as pd          # NEW
-from datetime import datetime # NEW
+import numpy as np
+from datetime import datetime, timedelta, timezone # NEW
 import re
+import html
+import random
+import string
+from concurrent.futures import ThreadPoolExecutor, wait
+from operator import itemgetter
+from collections import Counter, deque
+from itertools import chain
 
 try:
     from pinecone import Pinecone
     import openai
     import anthropic
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     import uuid
     import platform
 except ImportError as e:
@@ -23,31 +34,93 @@ except ImportError as e:
 
 
 
-@st.cache_resource
+@st.cache_resource(show_spinner=False)
 def setup_connections():
     try:
         pc = Pinecone(api_key=st.secrets["PINECONE_API_KEY"])
-        index = pc.Index(st.secrets["PINECONE_INDEX_NAME"])
+        # Size the pool for concurrent sessions rather than the host's CPU count
+        index = pc.Index(
+            st.secrets["PINECONE_INDEX_NAME"],
+            pool_threads=20,
+            connection_pool_maxsize=20
+        )
         claude_client = anthropic.Anthropic(api_key=st.secrets["ANTHROPIC_API_KEY"])
         return index, claude_client
     except Exception as e:
         st.error(f"Connection error: {e}")
         return None, None
 
+AIRTABLE_BASE_URL = "https://api.airtable.com/v0/appTCnWCPKMYPUXK0"
+
+@st.cache_resource
+def get_airtable_session():
+    """Shared Airtable HTTP session so connections are kept alive across calls and reruns"""
+    session = requests.Session()
+    session.headers.update({
+        "Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}",
+        "Accept-Encoding": "gzip"
+    })
+    # Rate limits (429) and gateway errors back off and honour Retry-After; POSTs are never replayed
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    )
+    session.mount("https://", adapter)
+    return session
+
+def fetch_airtable_records(url, params, timeout=5):
+    """Fetch all pages of an Airtable list request by following the offset cursor.
+    
+    Airtable returns at most 100 records per page, so maxRecords above 100 only
+    takes effect when the remaining pages are requested. Returns None if any
+    page fails.
+    """
+    session = get_airtable_session()
+    params = dict(params)
+    records = []
+    while True:
+        response = session.get(url, params=params, timeout=timeout)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        records.extend(data.get('records', []))
+        offset = data.get('offset')
+        if not offset:
+            return records
+        params['offset'] = offset
+
+@st.cache_resource
+def get_openai_client():
+    """Shared OpenAI client so embedding calls reuse its connection pool"""
+    return openai.OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+
+@st.cache_data(ttl=3600, max_entries=2048, show_spinner=False)
+def embed_text(text: str) -> List[float]:
+    """Cached OpenAI embedding - errors propagate so a failed call is never cached"""
+    response = get_openai_client().embeddings.create(
+        input=text,
+        model="text-embedding-3-small"
+    )
+    return response.data[0].embedding
+
 def get_embedding(text: str) -> List[float]:
     try:
-        api_key = st.secrets["OPENAI_API_KEY"]
-        
-        client = openai.OpenAI(api_key=api_key)
-        response = client.embeddings.create(
-            input=text,
-            model="text-embedding-3-small"
-        )
-        return response.data[0].embedding
+        # Collapse whitespace so trivially different copies of a question share a cache entry
+        return embed_text(' '.join(text.split()))
     except Exception as e:
         st.error(f"Embedding error: {e}")
         return []
 
+# Brackets and quotes left in list metadata that was stored as a string, e.g. '["Beginner"]'
+LIST_STRING_DELETIONS = str.maketrans('', '', '[]"\'')
+
 def extract_array_value(metadata_field):
     if not metadata_field:
         return "Not specified"
@@ -59,16 +132,31 @@ def extract_array_value(metadata_field):
         return "Not specified"
     if isinstance(metadata_field, str):
         if metadata_field.startswith('[') and metadata_field.endswith(']'):
-            cleaned = metadata_field.strip('[]').replace('"', '').replace("'", "")
-            cleaned = ' '.join(cleaned.split())
+            cleaned = ' '.join(metadata_field.translate(LIST_STRING_DELETIONS).split())
             return cleaned if cleaned else "Not specified"
     return str(metadata_field).strip() if metadata_field else "Not specified"
 
-def query_pinecone(index, question: str, top_k: int = 3) -> List[Dict]:
+def truncate_text(text: str, max_length: int) -> str:
+    """Cut text to max_length characters, marking the cut with '...'"""
+    return text if len(text) <= max_length else text[:max_length] + "..."
+
+def parse_airtable_timestamp(timestamp: str) -> datetime:
+    """Parse an Airtable UTC timestamp ('2024-05-01T10:00:00.000Z') into an aware datetime"""
+    if timestamp.endswith('Z'):
+        return datetime.fromisoformat(timestamp[:-1]).replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(timestamp)
+
+def format_airtable_date(timestamp: str, fmt: str = "%m/%d/%Y") -> str:
+    """Format an Airtable timestamp for display, or "Unknown" if it is missing or malformed"""
+    if not timestamp:
+        return "Unknown"
+    try:
+        return parse_airtable_timestamp(timestamp).strftime(fmt)
+    except ValueError:
+        return "Unknown"
+
+def search_pinecone(index, question_vector: List[float], top_k: int = 3) -> List[Dict]:
     try:
-        question_vector = get_embedding(question)
-        if not question_vector:
-            return []
         results = index.query(
             vector=question_vector,
             top_k=top_k,
@@ -90,8 +178,62 @@ def query_pinecone(index, question: str, top_k: int = 3) -> List[Dict]:
         st.error(f"Pinecone query error: {e}")
         return []
 
-def get_coaching_personality_enhancement():
-    return """
+def query_pinecone(index, question: str, top_k: int = 3) -> List[Dict]:
+    question_vector = get_embedding(question)
+    if not question_vector:
+        return []
+    return search_pinecone(index, question_vector, top_k)
+
+# Questions whose embeddings are at least this similar reuse the earlier Pinecone results
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_MAX_ENTRIES = 512
+
+def query_pinecone_cached(index, question: str, top_k: int = 3) -> List[Dict]:
+    """
+    query_pinecone with a per-player semantic cache kept in session_state.
+    Players keep coming back to the same topics, so near-duplicate questions
+    are answered from earlier results instead of another Pinecone round-trip.
+    """
+    question_vector = get_embedding(question)
+    if not question_vector:
+        return []
+    
+    vector = np.asarray(question_vector, dtype=np.float32)
+    vector /= np.linalg.norm(vector) or 1.0
+    
+    caches = st.session_state.setdefault('sem_cache', {})
+    cache_key = (st.session_state.get('player_record_id', ''), top_k)
+    if cache_key not in caches:
+        caches[cache_key] = {
+            'embeddings': np.empty((0, vector.size), dtype=np.float32),
+            'chunks': [],
+            'last_used': []
+        }
+    cache = caches[cache_key]
+    
+    if cache['chunks']:
+        similarities = cache['embeddings'] @ vector
+        best = int(similarities.argmax())
+        if similarities[best] >= SEMANTIC_CACHE_THRESHOLD:
+            cache['last_used'][best] = time.monotonic()
+            return list(cache['chunks'][best])
+    
+    chunks = search_pinecone(index, question_vector, top_k)
+    if chunks:
+        if len(cache['chunks']) >= SEMANTIC_CACHE_MAX_ENTRIES:
+            # Reuse the least recently used slot
+            slot = min(range(len(cache['last_used'])), key=cache['last_used'].__getitem__)
+            cache['embeddings'][slot] = vector
+            cache['chunks'][slot] = chunks
+            cache['last_used'][slot] = time.monotonic()
+        else:
+            cache['embeddings'] = np.vstack([cache['embeddings'], vector])
+            cache['chunks'].append(chunks)
+            cache['last_used'].append(time.monotonic())
+    return chunks
+
+# Behaviour anchors shared by every coaching prompt
+COACHING_PERSONALITY_ENHANCEMENT = """
 COACHING BEHAVIOR ANCHORS:
 - Acknowledge feelings first: "That sounds frustrating..." "I hear you saying..."
 - Use coaching stories occasionally: "I had a player who..." "I remember working with someone who..." "In my experience..." (max 1 sentence)
@@ -119,10 +261,10 @@ Content: {chunk['text']}
     context_text = "\n".join(context_sections)
     history_text = ""
     if conversation_history:
-        history_text = "\nPrevious conversation:\n"
-        for msg in conversation_history[12:]:
-            role = "Player" if msg['role'] == 'user' else "Coach"
-            history_text += f"{role}: {msg['content']}\n"
+        history_text = "\nPrevious conversation:\n" + "".join(
+            f"{'Player' if msg['role'] == 'user' else 'Coach'}: {msg['content']}\n"
+            for msg in conversation_history[-12:]
+        )
     return f"""You are a professional tennis coach providing REMOTE coaching advice through chat. The player is not physically with you, so focus on guidance they can apply on their own.
 
 Guidelines:
@@ -146,38 +288,52 @@ Current Player Question: "{question}"
 
 Respond as their remote tennis coach with a SHORT, focused response:"""
 
-def query_claude(client, prompt: str) -> str:
-    import time
+def claude_retry_delay(error, attempt: int, base: float = 1.0) -> float:
+    """Seconds to wait before retrying an overloaded Claude call - the server's retry-after if sent, else jittered exponential backoff"""
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    try:
+        return min(30.0, float(retry_after))
+    except (TypeError, ValueError):
+        # Jitter keeps concurrent sessions from retrying in lockstep
+        return min(30.0, random.uniform(base, base * 3) * 2 ** attempt)
+
+def stream_claude(client, prompt: str):
+    """Yield the coaching reply as Claude generates it, retrying overloads before any text is shown"""
     max_retries = 3
-    retry_delay = 2
     
     for attempt in range(max_retries):
+        started = False
         try:
-            response = client.messages.create(
+            with client.messages.stream(
                 model="claude-3-5-sonnet-20241022",
                 max_tokens=300,
                 messages=[
                     {"role": "user", "content": prompt}
                 ]
-            )
-            return response.content[0].text
+            ) as stream:
+                for text in stream.text_stream:
+                    started = True
+                    yield text
+            return
         except Exception as e:
-            if "529" in str(e) or "overloaded" in str(e).lower():
+            # Only retry before anything has been shown to the player
+            if not started and ("529" in str(e) or "overloaded" in str(e).lower()):
                 if attempt < max_retries - 1:
-                    time.sleep(retry_delay * (attempt + 1))
+                    time.sleep(claude_retry_delay(e, attempt))
                     continue
-            return f"Error generating coaching response: {e}"
+            yield f"Error generating coaching response: {e}"
+            return
 
 def find_player_by_email(email: str):
     try:
         # Normalize email to lowercase
         email = email.lower().strip()
         
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Players"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        url = f"{AIRTABLE_BASE_URL}/Players"
         params = {"filterByFormula": f"{{email}} = '{email}'"}
         
-        response = requests.get(url, headers=headers, params=params)
+        response = get_airtable_session().get(url, params=params, timeout=5)
         if response.status_code == 200:
             records = response.json().get('records', [])
             return records[0] if records else None
@@ -188,11 +344,7 @@ def find_player_by_email(email: str):
 def update_player_info(player_id: str, name: str = "", tennis_level: str = ""):
     """Update existing player with name and tennis level collected during coaching"""
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Players/{player_id}"
-        headers = {
-            "Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}",
-            "Content-Type": "application/json"
-        }
+        url = f"{AIRTABLE_BASE_URL}/Players/{player_id}"
         
         # Prepare update data
         update_data = {"fields": {}}
@@ -201,9 +353,13 @@ def update_player_info(player_id: str, name: str = "", tennis_level: str = ""):
         if tennis_level:
             update_data["fields"]["tennis_level"] = tennis_level
         
-        response = requests.patch(url, headers=headers, json=update_data)
+        response = get_airtable_session().patch(url, json=update_data, timeout=10)
         
-        return response.status_code == 200
+        if response.status_code == 200:
+            # Name/level are cached for the coaching prompt - drop the stale copy
+            get_current_player_info.clear()
+            return True
+        return False
     except Exception as e:
         return False
 
@@ -212,11 +368,7 @@ def create_new_player(email: str, name: str = "", tennis_level: str = ""):
         # Normalize email to lowercase
         email = email.lower().strip()
         
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Players"
-        headers = {
-            "Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}",
-            "Content-Type": "application/json"
-        }
+        url = f"{AIRTABLE_BASE_URL}/Players"
         
         # Use provided name, or extract from email, or leave empty for Coach Taai collection
         if name:
@@ -243,7 +395,7 @@ def create_new_player(email: str, name: str = "", tennis_level: str = ""):
         
         data = {"fields": fields}
         
-        response = requests.post(url, headers=headers, json=data)
+        response = get_airtable_session().post(url, json=data, timeout=10)
         
         if response.status_code == 200:
             return response.json()
@@ -251,19 +403,14 @@ def create_new_player(email: str, name: str = "", tennis_level: str = ""):
     except Exception as e:
         return None
 
-def classify_ending_intent(message_content: str) -> str:
-    """
-    Use AI to classify if a message indicates session ending intent
-    Returns: 'DEFINITIVE', 'LIKELY', 'AMBIGUOUS', or 'NOT_ENDING'
-    """
-    try:
-        # Quick obvious check first (for speed)
-        obvious_definitive = ["end session", "stop session", "goodbye", "farewell"]
-        if any(phrase in message_content.lower() for phrase in obvious_definitive):
-            return "DEFINITIVE"
-        
-        # Use Claude for nuanced detection
-        classification_prompt = f"""
+# Fast-path ending patterns, tried in order before asking Claude
+ENDING_DEFINITIVE_RE = re.compile(r"\b(?:goodbye|farewell|end session|stop session|bye coach)\b", re.IGNORECASE)
+ENDING_LIKELY_RE = re.compile(r"\b(?:thanks coach|thank you coach|see you(?: soon)?|got it,?\s*thanks)\b", re.IGNORECASE)
+ENDING_AMBIGUOUS_RE = re.compile(r"^\s*(?:thanks|thank you|bye|okay|ok|done)\s*[.!?]*\s*$", re.IGNORECASE)
+# Messages longer than this are coaching questions, not goodbyes, and skip the Claude classifier
+ENDING_CLASSIFIER_MAX_WORDS = 12
+
+ENDING_CLASSIFICATION_PROMPT = """
 Classify this message from a tennis coaching session. The player might be trying to end the session.
 
 Player message: "{message_content}"
@@ -280,21 +427,44 @@ NOT_ENDING - Clearly continuing conversation (questions, requests for help, tenn
 
 Respond with only one word: DEFINITIVE, LIKELY, AMBIGUOUS, or NOT_ENDING"""
 
-        # Get Claude's classification
-        _, claude_client = setup_connections()
+ENDING_CLASSIFICATIONS = frozenset({"DEFINITIVE", "LIKELY", "AMBIGUOUS", "NOT_ENDING"})
+
+@st.cache_data(ttl=600, max_entries=256, show_spinner=False)
+def classify_ending_with_claude(message_content: str, _claude_client) -> str:
+    """Claude's ending label for a message, cached - errors and off-list answers raise so they are never cached"""
+    classification_prompt = ENDING_CLASSIFICATION_PROMPT.format(message_content=message_content)
+    response = _claude_client.messages.create(
+        model="claude-3-5-sonnet-20241022",
+        max_tokens=10,
+        messages=[{"role": "user", "content": classification_prompt}]
+    )
+    
+    classification = response.content[0].text.strip().upper()
+    if classification not in ENDING_CLASSIFICATIONS:
+        raise ValueError(f"Unexpected ending classification: {classification}")
+    return classification
+
+def classify_ending_intent(message_content: str, claude_client) -> str:
+    """
+    Use AI to classify if a message indicates session ending intent
+    Returns: 'DEFINITIVE', 'LIKELY', 'AMBIGUOUS', or 'NOT_ENDING'
+    """
+    try:
+        # Quick obvious checks first (for speed)
+        if ENDING_DEFINITIVE_RE.search(message_content):
+            return "DEFINITIVE"
+        if len(message_content.split()) > ENDING_CLASSIFIER_MAX_WORDS:
+            return "NOT_ENDING"
+        # "Thanks coach, how do I...?" is a question, so only question-free messages take the fast path
+        if '?' not in message_content and ENDING_LIKELY_RE.search(message_content):
+            return "LIKELY"
+        if ENDING_AMBIGUOUS_RE.match(message_content):
+            return "AMBIGUOUS"
+        
+        # Use Claude for nuanced detection of short messages
         if claude_client:
-            response = claude_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=10,
-                messages=[{"role": "user", "content": classification_prompt}]
-            )
-            
-            classification = response.content[0].text.strip().upper()
-            
-            # Validate response
-            valid_responses = ["DEFINITIVE", "LIKELY", "AMBIGUOUS", "NOT_ENDING"]
-            if classification in valid_responses:
-                return classification
+            # Normalized so repeats like "Thanks " and "thanks" share one cached answer
+            return classify_ending_with_claude(' '.join(message_content.lower().split()), claude_client)
         
         # Fallback classification if Claude fails
         return fallback_classification(message_content)
@@ -317,7 +487,23 @@ def fallback_classification(message_content: str) -> str:
     else:
         return "NOT_ENDING"
 
-def detect_session_end(message_content: str, conversation_history: list = None) -> dict:
+# Replies accepted while a session-end confirmation is pending
+SESSION_END_CONFIRM_REPLIES = frozenset({"yes", "y", "yeah", "yep", "sure"})
+SESSION_END_DECLINE_REPLIES = frozenset({"no", "n", "nope", "not yet", "continue"})
+ADMIN_TRIGGER_PHRASE = "hilly spike"
+# Longest chat input that can be a command rather than a coaching question
+SHORT_REPLY_MAX_LEN = max(len(reply) for reply in SESSION_END_CONFIRM_REPLIES | SESSION_END_DECLINE_REPLIES | {ADMIN_TRIGGER_PHRASE})
+
+# Phrases in recent player messages suggesting the coaching has landed and the session is winding down
+COACHING_COMPLETE_RE = re.compile(
+    "|".join(re.escape(signal) for signal in (
+        "got it", "understand", "will practice", "makes sense",
+        "clear", "helpful", "that helps", "i see"
+    )),
+    re.IGNORECASE
+)
+
+def detect_session_end(message_content: str, claude_client, conversation_history: list = None) -> dict:
     """
     Intelligent session end detection with context awareness
     Returns: {'should_end': bool, 'confidence': str, 'needs_confirmation': bool}
@@ -325,7 +511,7 @@ def detect_session_end(message_content: str, conversation_history: list = None)
     message_lower = message_content.lower().strip()
     
     # Use AI to classify the message intent
-    ending_classification = classify_ending_intent(message_content)
+    ending_classification = classify_ending_intent(message_content, claude_client)
     
     if ending_classification == "DEFINITIVE":
         return {'should_end': True, 'confidence': 'high', 'needs_confirmation': False}
@@ -339,17 +525,10 @@ def detect_session_end(message_content: str, conversation_history: list = None)
         if word_count <= 3:
             # Check conversation context for winding down signals
             if conversation_history and len(conversation_history) >= 4:
-                recent_messages = [msg['content'].lower() for msg in conversation_history[-4:] if msg['role'] == 'user']
-                
                 # Look for patterns suggesting session is ending
-                coaching_complete_signals = [
-                    "got it", "understand", "will practice", "makes sense", 
-                    "clear", "helpful", "that helps", "i see"
-                ]
-                
                 has_completion_signals = any(
-                    any(signal in msg for signal in coaching_complete_signals) 
-                    for msg in recent_messages
+                    COACHING_COMPLETE_RE.search(msg['content'])
+                    for msg in conversation_history[-4:] if msg['role'] == 'user'
                 )
                 
                 if has_completion_signals:
@@ -376,13 +555,9 @@ def generate_session_end_confirmation(user_message: str, confidence: str) -> str
 
 def update_player_session_count(player_record_id: str):
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Players/{player_record_id}"
-        headers = {
-            "Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}",
-            "Content-Type": "application/json"
-        }
+        url = f"{AIRTABLE_BASE_URL}/Players/{player_record_id}"
         
-        response = requests.get(url, headers=headers)
+        response = get_airtable_session().get(url, timeout=5)
         if response.status_code == 200:
             current_data = response.json()
             current_sessions = current_data.get('fields', {}).get('total_sessions', 0)
@@ -393,7 +568,7 @@ def update_player_session_count(player_record_id: str):
                 }
             }
             
-            update_response = requests.patch(url, headers=headers, json=update_data)
+            update_response = get_airtable_session().patch(url, json=update_data, timeout=10)
             return update_response.status_code == 200
         return False
     except Exception as e:
@@ -401,36 +576,22 @@ def update_player_session_count(player_record_id: str):
 
 def mark_session_completed(player_record_id: str, session_id: str) -> bool:
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
         
-        session_id_number = int(''.join(filter(str.isdigit, session_id))) if session_id else 1
+        session_id_number = session_id_to_number(session_id)
         
         params = {
-            "filterByFormula": f"AND({{session_id}} = {session_id_number}, {{session_status}} = 'active')"
+            "filterByFormula": f"AND({{session_id}} = {session_id_number}, {{session_status}} = 'active')",
+            "fields[]": ["session_status"]
         }
         
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            records = response.json().get('records', [])
-            
-            update_headers = {
-                "Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}",
-                "Content-Type": "application/json"
-            }
-            
-            for record in records:
-                record_id = record['id']
-                update_url = f"{url}/{record_id}"
-                update_data = {
-                    "fields": {
-                        "session_status": "completed"
-                    }
-                }
-                
-                requests.patch(update_url, headers=update_headers, json=update_data)
-            
-            return len(records) > 0
+        records = fetch_airtable_records(url, params)
+        if records:
+            update_airtable_records(
+                "Active_Sessions",
+                [(record['id'], {"session_status": "completed"}) for record in records]
+            )
+            return True
         
         return False
     except Exception as e:
@@ -438,46 +599,99 @@ def mark_session_completed(player_record_id: str, session_id: str) -> bool:
 
 def get_session_messages(player_record_id: str, session_id: str) -> list:
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
         
-        session_id_number = int(''.join(filter(str.isdigit, session_id))) if session_id else 1
+        session_id_number = session_id_to_number(session_id)
         
         params = {
             "filterByFormula": f"{{session_id}} = {session_id_number}",
             "sort[0][field]": "message_order",
-            "sort[0][direction]": "asc"
+            "sort[0][direction]": "asc",
+            "fields[]": ["role", "message_content", "message_order"]
         }
         
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            records = response.json().get('records', [])
-            messages = []
-            for record in records:
-                fields = record.get('fields', {})
-                messages.append({
-                    'role': fields.get('role', ''),
-                    'content': fields.get('message_content', ''),
-                    'order': fields.get('message_order', 0)
-                })
-            return messages
-        return []
+        # Page through the whole session so long sessions keep their most recent turns
+        records = fetch_airtable_records(url, params)
+        if records is None:
+            return []
+        
+        messages = []
+        for record in records:
+            fields = record.get('fields', {})
+            messages.append({
+                'role': fields.get('role', ''),
+                'content': fields.get('message_content', ''),
+                'order': fields.get('message_order', 0)
+            })
+        return messages
     except Exception as e:
         return []
+# Section headers Claude is asked to emit in a session summary, and the Session_Summaries field each fills
+SUMMARY_SECTION_FIELDS = {
+    'TECHNICAL_FOCUS': 'technical_focus',
+    'MENTAL_GAME': 'mental_game_notes',
+    'HOMEWORK_ASSIGNED': 'homework_assigned',
+    'NEXT_SESSION_FOCUS': 'next_session_focus',
+    'KEY_BREAKTHROUGHS': 'key_breakthroughs',
+    'CONDENSED_SUMMARY': 'condensed_summary',
+}
+SUMMARY_SECTION_RE = re.compile(r'^[ \t]*(' + '|'.join(SUMMARY_SECTION_FIELDS) + r'):', re.MULTILINE)
+
+# Sessions shorter than this are summarized locally instead of with an 800-token Claude call
+SUMMARY_MIN_MESSAGES_FOR_CLAUDE = 8
+# Messages kept from the start and end of a long session when it is sent to Claude for summary
+SUMMARY_HEAD_MESSAGES = 6
+SUMMARY_TAIL_MESSAGES = 24
+# Drill suggestions in coach messages, e.g. "try shadow swings before bed"
+HOMEWORK_RE = re.compile(r"\b(?:try|practice|work on|focus on)\s+[^.!?\n]{3,80}", re.IGNORECASE)
+
+def format_summary_transcript(messages: list) -> str:
+    """Player/Coach transcript of Active_Sessions messages for the summary prompt"""
+    return "".join(
+        f"{'Player' if msg['role'] == 'player' else 'Coach'}: {msg['content']}\n\n"
+        for msg in messages
+    )
+
+def template_session_summary(messages: list) -> dict:
+    """Summary for a short session, built from the messages themselves"""
+    player_messages = [msg['content'].strip() for msg in messages if msg['role'] == 'player' and msg['content'].strip()]
+    coach_messages = [msg['content'].strip() for msg in messages if msg['role'] != 'player' and msg['content'].strip()]
+    homework = [match.group(0) for content in coach_messages for match in HOMEWORK_RE.finditer(content)]
+    
+    return {
+        'technical_focus': truncate_text('; '.join(player_messages), 300),
+        'mental_game_notes': '',
+        'homework_assigned': truncate_text('; '.join(homework[:3]), 300),
+        'next_session_focus': homework[0] if homework else 'Continue working on tennis fundamentals',
+        'key_breakthroughs': '',
+        'condensed_summary': truncate_text(coach_messages[-1], 1000) if coach_messages else ''
+    }
+
 def generate_session_summary(messages: list, claude_client) -> dict:
+    if len(messages) < SUMMARY_MIN_MESSAGES_FOR_CLAUDE:
+        return template_session_summary(messages)
+    
     try:
         # st.error(f"DEBUG: Starting summary generation with {len(messages)} messages")
         # st.error(f"DEBUG: Sample message: {messages[0] if messages else 'None'}")
-        conversation_text = ""
-        for msg in messages:
-            role_label = "Player" if msg['role'] == 'player' else "Coach"
-            conversation_text += f"{role_label}: {msg['content']}\n\n"
+        # Long sessions keep their opening and most recent turns so the prompt stays bounded
+        elided = len(messages) - SUMMARY_HEAD_MESSAGES - SUMMARY_TAIL_MESSAGES
+        if elided > 0:
+            conversation_text = (
+                format_summary_transcript(messages[:SUMMARY_HEAD_MESSAGES])
+                + f"[... {elided} messages from the middle of the session omitted ...]\n\n"
+                + format_summary_transcript(messages[-SUMMARY_TAIL_MESSAGES:])
+            )
+        else:
+            conversation_text = format_summary_transcript(messages)
         
         summary_prompt = f"""Analyze this tennis coaching session and extract key information. The session is between a coach and player working on tennis improvement.
 
 CONVERSATION:
 {conversation_text}
 
+If part of the conversation is marked as omitted, summarize only what is shown and do not guess at the missing messages.
+
 Please analyze and provide a structured summary with these exact sections:
 
 TECHNICAL_FOCUS: What specific tennis techniques were discussed or worked on? (e.g., forehand grip, serve motion, backhand slice)
@@ -510,47 +724,12 @@ CONDENSED_SUMMARY: [your analysis]"""
         # st.error(f"DEBUG: Claude response length: {len(response.content[0].text)}")
         summary_text = response.content[0].text
         
+        # split() yields [preamble, header, body, header, body, ...]
+        parts = SUMMARY_SECTION_RE.split(summary_text)
         summary_data = {}
-        current_section = None
-        current_content = []
-        
-        for line in summary_text.split('\n'):
-            line = line.strip()
-            if line.startswith('TECHNICAL_FOCUS:'):
-                if current_section:
-                    summary_data[current_section] = ' '.join(current_content).strip()
-                current_section = 'technical_focus'
-                current_content = [line.replace('TECHNICAL_FOCUS:', '').strip()]
-            elif line.startswith('MENTAL_GAME:'):
-                if current_section:
-                    summary_data[current_section] = ' '.join(current_content).strip()
-                current_section = 'mental_game_notes'
-                current_content = [line.replace('MENTAL_GAME:', '').strip()]
-            elif line.startswith('HOMEWORK_ASSIGNED:'):
-                if current_section:
-                    summary_data[current_section] = ' '.join(current_content).strip()
-                current_section = 'homework_assigned'
-                current_content = [line.replace('HOMEWORK_ASSIGNED:', '').strip()]
-            elif line.startswith('NEXT_SESSION_FOCUS:'):
-                if current_section:
-                    summary_data[current_section] = ' '.join(current_content).strip()
-                current_section = 'next_session_focus'
-                current_content = [line.replace('NEXT_SESSION_FOCUS:', '').strip()]
-            elif line.startswith('KEY_BREAKTHROUGHS:'):
-                if current_section:
-                    summary_data[current_section] = ' '.join(current_content).strip()
-                current_section = 'key_breakthroughs'
-                current_content = [line.replace('KEY_BREAKTHROUGHS:', '').strip()]
-            elif line.startswith('CONDENSED_SUMMARY:'):
-                if current_section:
-                    summary_data[current_section] = ' '.join(current_content).strip()
-                current_section = 'condensed_summary'
-                current_content = [line.replace('CONDENSED_SUMMARY:', '').strip()]
-            elif line and current_section:
-                current_content.append(line)
-        
-        if current_section:
-            summary_data[current_section] = ' '.join(current_content).strip()
+        for header, body in zip(parts[1::2], parts[2::2]):
+            lines = (line.strip() for line in body.split('\n'))
+            summary_data[SUMMARY_SECTION_FIELDS[header]] = ' '.join(line for line in lines if line)
         
         return summary_data
         
@@ -569,11 +748,7 @@ def save_session_summary(player_record_id: str, session_number: int, summary_dat
     try:
         # st.error(f"DEBUG: Attempting to save summary - Player: {player_record_id}, Session: {session_number}")
         # st.error(f"DEBUG: Summary data keys: {list(summary_data.keys())}")
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Session_Summaries"
-        headers = {
-            "Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}",
-            "Content-Type": "application/json"
-        }
+        url = f"{AIRTABLE_BASE_URL}/Session_Summaries"
         
         original_tokens = original_message_count * 50
         summary_tokens = len(summary_data.get('condensed_summary', '').split()) * 1.3
@@ -594,7 +769,7 @@ def save_session_summary(player_record_id: str, session_number: int, summary_dat
             }
         }
         
-        response = requests.post(url, headers=headers, json=data)
+        response = get_airtable_session().post(url, json=data, timeout=10)
         # st.error(f"DEBUG: Airtable response code: {response.status_code}")
         # st.error(f"DEBUG: Airtable error details: {response.text}")
         return response.status_code == 200
@@ -605,20 +780,24 @@ def save_session_summary(player_record_id: str, session_number: int, summary_dat
 def process_completed_session(player_record_id: str, session_id: str, claude_client) -> bool:
     # st.error(f"DEBUG: process_completed_session called - START")
     try:
-        # st.error(f"DEBUG: Getting messages for session {session_id}")
-        messages = get_session_messages(player_record_id, session_id)
-        # st.error(f"DEBUG: Retrieved {len(messages)} messages")
-        
-        if not messages:
-            # st.error("DEBUG: No messages found - returning False")
-            return False
+        player_url = f"{AIRTABLE_BASE_URL}/Players/{player_record_id}"
         
-        summary_data = generate_session_summary(messages, claude_client)
-        
-        player_url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Players/{player_record_id}"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # The player's session count doesn't depend on the summary - fetch it while the messages load and Claude runs
+            player_future = executor.submit(get_airtable_session().get, player_url, timeout=5)
+            
+            # st.error(f"DEBUG: Getting messages for session {session_id}")
+            messages = get_session_messages(player_record_id, session_id)
+            # st.error(f"DEBUG: Retrieved {len(messages)} messages")
+            
+            if not messages:
+                # st.error("DEBUG: No messages found - returning False")
+                return False
+            
+            summary_data = generate_session_summary(messages, claude_client)
+            
+            player_response = player_future.result()
         
-        player_response = requests.get(player_url, headers=headers)
         if player_response.status_code == 200:
             player_data = player_response.json()
             session_number = player_data.get('fields', {}).get('total_sessions', 1)
@@ -640,26 +819,31 @@ def process_completed_session(player_record_id: str, session_id: str, claude_cli
 def cleanup_abandoned_sessions(claude_client, dry_run=True, preview_mode=False):
     """Mark old active sessions as completed and generate summaries"""
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
         
         # Find sessions older than 30 minutes that are still "active"
-        from datetime import datetime, timedelta
         cutoff_time = (datetime.now() - timedelta(minutes=15)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
         
+        # Admin trigger messages are dropped server-side rather than downloaded and skipped
         params = {
-            "filterByFormula": f"AND({{session_status}} = 'active', {{timestamp}} < '{cutoff_time}')",
+            "filterByFormula": (
+                f"AND({{session_status}} = 'active', {{timestamp}} < '{cutoff_time}', "
+                f"NOT(FIND('{ADMIN_TRIGGER_PHRASE}', LOWER({{message_content}}))))"
+            ),
             "sort[0][field]": "session_id",
-            "sort[0][direction]": "desc"
+            "sort[0][direction]": "desc",
+            "sort[1][field]": "message_order",
+            "sort[1][direction]": "asc",
+            "pageSize": 100,
+            "fields[]": ["session_id", "message_content", "role", "message_order", "player_id", "timestamp"]
         }
         
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code != 200:
-            st.error(f"Failed to fetch sessions: {response.status_code}")
+        # Follow the offset cursor - a single page stops at 100 records
+        all_abandoned_records = fetch_airtable_records(url, params, timeout=10)
+        if all_abandoned_records is None:
+            st.error("Failed to fetch sessions from Airtable")
             return False
         
-        all_abandoned_records = response.json().get('records', [])
-        
         # Group messages by session_id and filter out admin sessions
         session_groups = {}
         admin_sessions_skipped = 0
@@ -673,11 +857,6 @@ def cleanup_abandoned_sessions(claude_client, dry_run=True, preview_mode=False):
             
             if not session_id:
                 continue
-                
-            # Skip obvious admin sessions
-            if 'hilly spike' in message_content.lower():
-                admin_sessions_skipped += 1
-                continue
             
             # Group by session_id
             if session_id not in session_groups:
@@ -696,10 +875,6 @@ def cleanup_abandoned_sessions(claude_client, dry_run=True, preview_mode=False):
                 'order': message_order
             })
         
-        # Sort messages within each session
-        for session_data in session_groups.values():
-            session_data['messages'].sort(key=lambda x: x['order'])
-        
         # Filter out sessions that are likely admin (less than 4 messages)
         legitimate_sessions = []
         for session_id, session_data in session_groups.items():
@@ -724,7 +899,7 @@ def cleanup_abandoned_sessions(claude_client, dry_run=True, preview_mode=False):
                     # Show first few messages to determine if it's legitimate
                     for j, msg in enumerate(session_data['messages'][:6]):  # Show first 6 messages
                         role_label = "🧑‍🎓 Player" if msg['role'] == 'player' else "🎾 Coach"
-                        content = msg['content'][:100] + "..." if len(msg['content']) > 100 else msg['content']
+                        content = truncate_text(msg['content'], 100)
                         st.write(f"**{role_label}:** {content}")
                         
                         if j == 5 and len(session_data['messages']) > 6:
@@ -792,19 +967,22 @@ def cleanup_abandoned_sessions(claude_client, dry_run=True, preview_mode=False):
         st.error(f"Cleanup error: {e}")
         return False
 
+# "0.87 relevance" scores recorded in resource_details for Pinecone-backed replies
+RELEVANCE_SCORE_RE = re.compile(r'(\d+\.\d+)\s+relevance')
+
 def analyze_session_fallback_details(session_id):
     """Get detailed fallback analysis for a specific session"""
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
         
         params = {
             "filterByFormula": f"{{session_id}} = {session_id}",
             "sort[0][field]": "message_order",
-            "sort[0][direction]": "asc"
+            "sort[0][direction]": "asc",
+            "fields[]": ["role", "message_content", "coaching_resources_used", "resource_details", "message_order"]
         }
         
-        response = requests.get(url, headers=headers, params=params)
+        response = get_airtable_session().get(url, params=params, timeout=5)
         if response.status_code == 200:
             records = response.json().get('records', [])
             
@@ -822,8 +1000,7 @@ def analyze_session_fallback_details(session_id):
                         # Extract relevance from resource details
                         relevance_scores = []
                         if resource_details:
-                            import re
-                            scores = re.findall(r'(\d+\.\d+)\s+relevance', resource_details)
+                            scores = RELEVANCE_SCORE_RE.findall(resource_details)
                             relevance_scores = [float(score) for score in scores]
                         
                         max_relevance = max(relevance_scores) if relevance_scores else 0.0
@@ -835,7 +1012,7 @@ def analyze_session_fallback_details(session_id):
                     
                     fallback_analysis.append({
                         'message_order': message_order,
-                        'message_preview': message_content[:60] + "..." if len(message_content) > 60 else message_content,
+                        'message_preview': truncate_text(message_content, 60),
                         'mode_used': mode_used,
                         'mode_details': mode_details,
                         'resources_used': resources_used,
@@ -853,87 +1030,90 @@ def analyze_session_fallback_details(session_id):
 def detect_content_gaps():
     """Analyze fallback patterns to identify content gaps"""
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
         
         # Get recent sessions (last 100 coach responses)
         params = {
-            "filterByFormula": "{{role}} = 'coach'",
+            "filterByFormula": "{role} = 'coach'",
             "sort[0][field]": "timestamp",
             "sort[0][direction]": "desc",
-            "maxRecords": 100
+            "maxRecords": 100,
+            "fields[]": ["coaching_resources_used", "resource_details", "session_id", "message_order"]
         }
         
-        response = requests.get(url, headers=headers, params=params)
+        response = get_airtable_session().get(url, params=params, timeout=5)
         if response.status_code == 200:
             records = response.json().get('records', [])
             
+            # Relevance is recorded on the coach record itself, so score every response first
+            responses = []
+            for record in records:
+                get_field = record.get('fields', {}).get
+                resources_used = get_field('coaching_resources_used', 0)
+                max_relevance = None
+                if resources_used != 0:
+                    scores = RELEVANCE_SCORE_RE.findall(get_field('resource_details', ''))
+                    if scores:
+                        max_relevance = max(float(score) for score in scores)
+                responses.append((get_field('session_id'), get_field('message_order', 0), resources_used, max_relevance))
+            
+            # Only fallbacks and high-relevance (>= 0.8) replies are analysed by topic, so only their user messages are fetched
+            user_messages = get_user_messages_for_responses(
+                (session_id, message_order - 1)
+                for session_id, message_order, resources_used, max_relevance in responses
+                if resources_used == 0 or (max_relevance is not None and max_relevance >= 0.8)
+            )
+            
+            # Players repeat the same questions across sessions - extract each distinct message's keywords once
+            keywords_by_message = {}
+            def keywords_for(message):
+                if message not in keywords_by_message:
+                    keywords_by_message[message] = extract_topic_keywords(message)
+                return keywords_by_message[message]
+            
             # Analyze fallback patterns
             fallback_topics = []
             high_relevance_topics = []
-            total_responses = 0
+            total_responses = len(responses)
             fallback_count = 0
             
-            for record in records:
-                fields = record.get('fields', {})
-                resources_used = fields.get('coaching_resources_used', 0)
-                resource_details = fields.get('resource_details', '')
-                
-                # Get corresponding user message to analyze topic
-                session_id = fields.get('session_id')
-                message_order = fields.get('message_order', 0)
-                
+            for session_id, message_order, resources_used, max_relevance in responses:
                 # Find the user message that triggered this response
-                user_message = get_user_message_for_response(session_id, message_order - 1)
-                
-                total_responses += 1
+                user_message = user_messages.get((session_id, message_order - 1))
                 
                 if resources_used == 0:
                     # This was a fallback
                     fallback_count += 1
                     if user_message:
-                        topic_keywords = extract_topic_keywords(user_message)
+                        topic_keywords = keywords_for(user_message)
                         fallback_topics.append({
-                            'user_query': user_message[:50] + "..." if len(user_message) > 50 else user_message,
+                            'user_query': truncate_text(user_message, 50),
                             'keywords': topic_keywords,
                             'session_id': session_id
                         })
-                else:
-                    # This used Pinecone successfully
-                    if user_message:
-                        import re
-                        scores = re.findall(r'(\d+\.\d+)\s+relevance', resource_details)
-                        if scores:
-                            max_relevance = max(float(score) for score in scores)
-                            if max_relevance >= 0.8:  # High relevance
-                                topic_keywords = extract_topic_keywords(user_message)
-                                high_relevance_topics.append({
-                                    'user_query': user_message[:50] + "..." if len(user_message) > 50 else user_message,
-                                    'keywords': topic_keywords,
-                                    'relevance': max_relevance,
-                                    'session_id': session_id
-                                })
+                elif user_message and max_relevance is not None and max_relevance >= 0.8:
+                    # This used Pinecone successfully, with high relevance
+                    topic_keywords = keywords_for(user_message)
+                    high_relevance_topics.append({
+                        'user_query': truncate_text(user_message, 50),
+                        'keywords': topic_keywords,
+                        'relevance': max_relevance,
+                        'session_id': session_id
+                    })
             
             # Calculate fallback rate
             fallback_rate = (fallback_count / total_responses * 100) if total_responses > 0 else 0
             
             # Analyze topic patterns
-            fallback_keywords = {}
-            for topic in fallback_topics:
-                for keyword in topic['keywords']:
-                    fallback_keywords[keyword] = fallback_keywords.get(keyword, 0) + 1
-            
-            high_relevance_keywords = {}
-            for topic in high_relevance_topics:
-                for keyword in topic['keywords']:
-                    high_relevance_keywords[keyword] = high_relevance_keywords.get(keyword, 0) + 1
+            fallback_keywords = Counter(chain.from_iterable(topic['keywords'] for topic in fallback_topics))
+            high_relevance_keywords = Counter(chain.from_iterable(topic['keywords'] for topic in high_relevance_topics))
             
             return {
                 'fallback_rate': fallback_rate,
                 'total_responses': total_responses,
                 'fallback_count': fallback_count,
-                'common_fallback_topics': sorted(fallback_keywords.items(), key=lambda x: x[1], reverse=True)[:10],
-                'high_performing_topics': sorted(high_relevance_keywords.items(), key=lambda x: x[1], reverse=True)[:10],
+                'common_fallback_topics': fallback_keywords.most_common(10),
+                'high_performing_topics': high_relevance_keywords.most_common(10),
                 'recent_fallbacks': fallback_topics[:5],
                 'recent_successes': high_relevance_topics[:5]
             }
@@ -944,44 +1124,54 @@ def detect_content_gaps():
         st.error(f"Error detecting content gaps: {e}")
         return None
 
-def get_user_message_for_response(session_id, expected_order):
-    """Get the user message that triggered a specific coach response"""
-    try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
-        
-        params = {
-            "filterByFormula": f"AND({{session_id}} = {session_id}, {{message_order}} = {expected_order}, {{role}} = 'player')",
-            "maxRecords": 1
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            records = response.json().get('records', [])
-            if records:
-                return records[0].get('fields', {}).get('message_content', '')
-        return None
-        
-    except Exception as e:
-        return None
+# Player messages looked up per Airtable request - keeps the OR formula well inside URL limits
+USER_MESSAGE_LOOKUP_BATCH = 25
+
+def get_user_messages_for_responses(keys) -> dict:
+    """Player message content keyed by (session_id, message_order), fetched in batched OR lookups"""
+    url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
+    keys = [key for key in dict.fromkeys(keys) if key[0] is not None]
+    
+    batch_params = []
+    for start in range(0, len(keys), USER_MESSAGE_LOOKUP_BATCH):
+        conditions = ", ".join(
+            f"AND({{session_id}} = {session_id}, {{message_order}} = {message_order})"
+            for session_id, message_order in keys[start:start + USER_MESSAGE_LOOKUP_BATCH]
+        )
+        batch_params.append({
+            "filterByFormula": f"AND({{role}} = 'player', OR({conditions}))",
+            "fields[]": ["session_id", "message_order", "message_content"]
+        })
+    if not batch_params:
+        return {}
+    
+    # The batches are independent, so their round-trips overlap on the shared session
+    with ThreadPoolExecutor(max_workers=min(4, len(batch_params))) as executor:
+        batches = list(executor.map(lambda params: fetch_airtable_records(url, params), batch_params))
+    
+    user_messages = {}
+    for records in batches:
+        for record in records or []:
+            fields = record.get('fields', {})
+            user_messages[(fields.get('session_id'), fields.get('message_order'))] = fields.get('message_content', '')
+    return user_messages
+
+TENNIS_KEYWORDS = (
+    'forehand', 'backhand', 'serve', 'volley', 'smash', 'drop shot',
+    'slice', 'topspin', 'backspin', 'grip', 'stance', 'footwork',
+    'court', 'net', 'baseline', 'rally', 'match', 'game', 'set',
+    'technique', 'practice', 'drill', 'training', 'coach', 'lesson',
+    'mental', 'strategy', 'tactics', 'consistency', 'power', 'spin',
+    'movement', 'positioning', 'timing', 'rhythm', 'balance'
+)
+# Keywords at the start of a word, so plurals like "serves" still count but "upset" is not "set"
+TENNIS_KEYWORD_RE = re.compile(r"\b(?:" + "|".join(re.escape(keyword) for keyword in TENNIS_KEYWORDS) + ")")
 
 def extract_topic_keywords(message):
     """Extract tennis-related keywords from a message"""
-    tennis_keywords = [
-        'forehand', 'backhand', 'serve', 'volley', 'smash', 'drop shot',
-        'slice', 'topspin', 'backspin', 'grip', 'stance', 'footwork',
-        'court', 'net', 'baseline', 'rally', 'match', 'game', 'set',
-        'technique', 'practice', 'drill', 'training', 'coach', 'lesson',
-        'mental', 'strategy', 'tactics', 'consistency', 'power', 'spin',
-        'movement', 'positioning', 'timing', 'rhythm', 'balance'
-    ]
-    
     message_lower = message.lower()
-    found_keywords = []
-    
-    for keyword in tennis_keywords:
-        if keyword in message_lower:
-            found_keywords.append(keyword)
+    # Unique keywords in the order they appear
+    found_keywords = list(dict.fromkeys(TENNIS_KEYWORD_RE.findall(message_lower)))
     
     # If no tennis keywords found, extract first few words as general topic
     if not found_keywords:
@@ -990,6 +1180,27 @@ def extract_topic_keywords(message):
     
     return found_keywords[:5]  # Return max 5 keywords
 
+# Review marker appended to resource_details by mark_session_reviewed
+ADMIN_REVIEW_RE = re.compile(r'\[ADMIN_REVIEWED: (.*?) on (.*?)\]')
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_session_head(session_id: str) -> tuple:
+    """(record_id, resource_details) of the Active_Sessions record that carries a session's review marker"""
+    url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
+    
+    params = {
+        "filterByFormula": f"{{session_id}} = {session_id}",
+        "maxRecords": 1,
+        "fields[]": ["resource_details"]
+    }
+    
+    response = get_airtable_session().get(url, params=params, timeout=5)
+    response.raise_for_status()
+    records = response.json().get('records', [])
+    if not records:
+        return None, ''
+    return records[0]['id'], records[0].get('fields', {}).get('resource_details', '')
+
 def mark_session_reviewed(session_id: str, admin_identifier: str = "admin") -> bool:
     """Mark a session as reviewed by admin"""
     try:
@@ -1001,39 +1212,23 @@ def mark_session_reviewed(session_id: str, admin_identifier: str = "admin") -> b
         
         # Try to also store in a persistent way using Airtable
         # We'll add a comment or note to one of the session records
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
-        
-        # Find a record from this session to add review marker
-        params = {
-            "filterByFormula": f"{{session_id}} = {session_id}",
-            "maxRecords": 1
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            records = response.json().get('records', [])
-            if records:
-                record_id = records[0]['id']
-                
-                # Add review marker to the record
-                update_url = f"{url}/{record_id}"
-                update_headers = {
-                    "Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}",
-                    "Content-Type": "application/json"
-                }
-                
-                # Add or update a review field - we'll use resource_details field to store review info
-                current_details = records[0].get('fields', {}).get('resource_details', '')
-                review_marker = f"\n[ADMIN_REVIEWED: {admin_identifier} on {datetime.now().strftime('%Y-%m-%d %H:%M')}]"
-                
-                update_data = {
-                    "fields": {
-                        "resource_details": current_details + review_marker
-                    }
+        record_id, current_details = get_session_head(session_id)
+        # get_review_status reports the first marker, so a session that already has one needs no write
+        if record_id and not ADMIN_REVIEW_RE.search(current_details):
+            # Add review marker to the record
+            update_url = f"{AIRTABLE_BASE_URL}/Active_Sessions/{record_id}"
+            
+            # Add or update a review field - we'll use resource_details field to store review info
+            review_marker = f"\n[ADMIN_REVIEWED: {admin_identifier} on {datetime.now().strftime('%Y-%m-%d %H:%M')}]"
+            
+            update_data = {
+                "fields": {
+                    "resource_details": current_details + review_marker
                 }
-                
-                requests.patch(update_url, headers=update_headers, json=update_data)
+            }
+            
+            get_airtable_session().patch(update_url, json=update_data, timeout=10)
+            get_session_head.clear()
         
         return True
         
@@ -1051,23 +1246,11 @@ def is_session_reviewed(session_id: str) -> bool:
             return True
         
         # Check database for persistent review marker
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
-        
-        params = {
-            "filterByFormula": f"{{session_id}} = {session_id}",
-            "maxRecords": 1
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            records = response.json().get('records', [])
-            if records:
-                resource_details = records[0].get('fields', {}).get('resource_details', '')
-                if '[ADMIN_REVIEWED:' in resource_details:
-                    # Add to session state for faster future checks
-                    st.session_state.reviewed_sessions.add(session_id)
-                    return True
+        _, resource_details = get_session_head(session_id)
+        if '[ADMIN_REVIEWED:' in resource_details:
+            # Add to session state for faster future checks
+            st.session_state.reviewed_sessions.add(session_id)
+            return True
         
         return False
         
@@ -1077,81 +1260,132 @@ def is_session_reviewed(session_id: str) -> bool:
 def get_review_status(session_id: str) -> dict:
     """Get detailed review status for a session"""
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
-        
-        params = {
-            "filterByFormula": f"{{session_id}} = {session_id}",
-            "maxRecords": 1
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            records = response.json().get('records', [])
-            if records:
-                resource_details = records[0].get('fields', {}).get('resource_details', '')
-                
-                if '[ADMIN_REVIEWED:' in resource_details:
-                    # Extract review info
-                    import re
-                    review_match = re.search(r'\[ADMIN_REVIEWED: (.*?) on (.*?)\]', resource_details)
-                    if review_match:
-                        return {
-                            'reviewed': True,
-                            'reviewer': review_match.group(1),
-                            'review_date': review_match.group(2)
-                        }
+        _, resource_details = get_session_head(session_id)
+        
+        if '[ADMIN_REVIEWED:' in resource_details:
+            # Extract review info
+            review_match = ADMIN_REVIEW_RE.search(resource_details)
+            if review_match:
+                return {
+                    'reviewed': True,
+                    'reviewer': review_match.group(1),
+                    'review_date': review_match.group(2)
+                }
         
         return {'reviewed': False, 'reviewer': None, 'review_date': None}
         
     except Exception as e:
         return {'reviewed': False, 'reviewer': None, 'review_date': None}
 
+def format_resource_details(chunks, role: str):
+    """Return (resource_count, resource_details) for the chunks behind a coach response"""
+    if not chunks or role != "assistant":
+        return 0, ""
+    
+    resource_details_list = []
+    for i, chunk in enumerate(chunks):
+        relevance_score = round(chunk.get('score', 0), 3)
+        source = chunk.get('source', 'Unknown')
+        topics = chunk.get('topics', 'General')
+        resource_details_list.append(
+            f"Resource {i+1}: {relevance_score} relevance | {topics} | {source}"
+        )
+    return len(chunks), "\n".join(resource_details_list)
+
+NON_DIGIT_RE = re.compile(r'\D')
+
+def session_id_to_number(session_id: str) -> int:
+    """Active_Sessions stores session_id as a number built from the id's digits"""
+    return int(NON_DIGIT_RE.sub('', session_id)) if session_id else 1
+
+def build_sss_fields(player_record_id: str, session_id: str, message_order: int, role: str, content: str, chunks=None) -> dict:
+    """Active_Sessions fields for one message"""
+    resource_count, resource_details = format_resource_details(chunks, role)
+    token_count = len(content.split()) * 1.3
+    
+    return {
+        "player_id": [player_record_id],
+        "session_id": session_id_to_number(session_id),
+        "message_order": message_order,
+        "role": "coach" if role == "assistant" else "player",
+        "message_content": content[:100000],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "token_count": int(token_count),
+        "session_status": "active",
+        "coaching_resources_used": resource_count,
+        "resource_details": resource_details[:100000] if resource_details else ""
+    }
+
+def build_conversation_log_fields(session_record_id, message_order: int, role: str, content: str, chunks=None) -> dict:
+    """Conversation_Log fields for one message, linked to its Active_Sessions record when known"""
+    resource_count, resource_details = format_resource_details(chunks, role)
+    
+    fields = {
+        "message_order": message_order,
+        "role": "coach" if role == "assistant" else "player",
+        "message_content": content[:100000],
+        "coaching_resources_used": resource_count,
+        "resource_details": resource_details[:100000] if resource_details else ""
+    }
+    
+    # Add session_id link if we found the session record
+    if session_record_id:
+        fields["session_id"] = [session_record_id]
+    return fields
+
+@st.cache_resource
+def get_session_record_ids() -> dict:
+    """session_id -> linked Active_Sessions record id, shared by the log workers across reruns"""
+    return {}
+
+def find_session_record_id(session_id: str):
+    """Find an Active_Sessions record for this session so Conversation_Log rows can link to it"""
+    # The linked record never changes once found, so each session is looked up once rather than per message
+    record_ids = get_session_record_ids()
+    if session_id in record_ids:
+        return record_ids[session_id]
+    
+    url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
+    params = {
+        "filterByFormula": f"{{session_id}} = {session_id_to_number(session_id)}",
+        "maxRecords": 1,
+        "fields[]": ["session_id"]
+    }
+    
+    response = get_airtable_session().get(url, params=params, timeout=5)
+    if response.status_code == 200:
+        records = response.json().get('records', [])
+        if records:
+            record_ids[session_id] = records[0]['id']
+            return records[0]['id']
+    return None
+
+def create_airtable_records(table: str, fields_list: list) -> bool:
+    """Create records in an Airtable table, up to 10 per request (the API's batch limit)"""
+    url = f"{AIRTABLE_BASE_URL}/{table}"
+    
+    success = True
+    for start in range(0, len(fields_list), 10):
+        data = {"records": [{"fields": fields} for fields in fields_list[start:start + 10]]}
+        response = get_airtable_session().post(url, json=data, timeout=10)
+        success = success and response.status_code == 200
+    return success
+
+def update_airtable_records(table: str, updates: list) -> bool:
+    """Update records in an Airtable table, up to 10 per request - updates is a list of (record_id, fields) pairs"""
+    url = f"{AIRTABLE_BASE_URL}/{table}"
+    
+    success = True
+    for start in range(0, len(updates), 10):
+        data = {"records": [{"id": record_id, "fields": fields} for record_id, fields in updates[start:start + 10]]}
+        response = get_airtable_session().patch(url, json=data, timeout=10)
+        success = success and response.status_code == 200
+    return success
+
 def log_message_to_sss(player_record_id: str, session_id: str, message_order: int, role: str, content: str, chunks=None) -> bool:
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {
-            "Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}",
-            "Content-Type": "application/json"
-        }
-        
-        # Process resource details if chunks provided
-        resource_count = 0
-        resource_details = ""
-        
-        if chunks and role == "assistant":
-            resource_count = len(chunks)
-            resource_details_list = []
-            for i, chunk in enumerate(chunks):
-                relevance_score = round(chunk.get('score', 0), 3)
-                source = chunk.get('source', 'Unknown')
-                topics = chunk.get('topics', 'General')
-                resource_details_list.append(
-                    f"Resource {i+1}: {relevance_score} relevance | {topics} | {source}"
-                )
-            resource_details = "\n".join(resource_details_list)
-        
-        token_count = len(content.split()) * 1.3
-        role_value = "coach" if role == "assistant" else "player"
-        session_id_number = int(''.join(filter(str.isdigit, session_id))) if session_id else 1
-        
-        data = {
-            "fields": {
-                "player_id": [player_record_id],
-                "session_id": session_id_number,
-                "message_order": message_order,
-                "role": role_value,
-                "message_content": content[:100000],
-                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                "token_count": int(token_count),
-                "session_status": "active",
-                "coaching_resources_used": resource_count,
-                "resource_details": resource_details[:100000] if resource_details else ""
-            }
-        }
-        
-        response = requests.post(url, headers=headers, json=data)
-        return response.status_code == 200
+        fields = build_sss_fields(player_record_id, session_id, message_order, role, content, chunks)
+        return create_airtable_records("Active_Sessions", [fields])
         
     except Exception as e:
         return False
@@ -1160,63 +1394,62 @@ def log_message_to_conversation_log(player_record_id: str, session_id: str, mess
                                    role: str, content: str, chunks=None) -> bool:
     """Enhanced logging that includes resource relevance data to Conversation_Log table"""
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Conversation_Log"
-        headers = {
-            "Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}",
-            "Content-Type": "application/json"
-        }
-        
-        # Process resource details if chunks provided
-        resource_count = 0
-        resource_details = ""
-        
-        if chunks and role == "assistant":
-            resource_count = len(chunks)
-            resource_details_list = []
-            for i, chunk in enumerate(chunks):
-                relevance_score = round(chunk.get('score', 0), 3)
-                source = chunk.get('source', 'Unknown')
-                topics = chunk.get('topics', 'General')
-                resource_details_list.append(
-                    f"Resource {i+1}: {relevance_score} relevance | {topics} | {source}"
-                )
-            resource_details = "\n".join(resource_details_list)
-        
         # Get the session record ID to link to
-        # First, find the Active_Sessions record with this session_id
-        session_search_url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        session_id_number = int(''.join(filter(str.isdigit, session_id))) if session_id else 1
-        
-        search_params = {
-            "filterByFormula": f"{{session_id}} = {session_id_number}",
-            "maxRecords": 1
-        }
-        
-        session_response = requests.get(session_search_url, headers=headers, params=search_params)
-        session_record_id = None
-        
-        if session_response.status_code == 200:
-            session_records = session_response.json().get('records', [])
-            if session_records:
-                session_record_id = session_records[0]['id']
+        session_record_id = find_session_record_id(session_id)
+        fields = build_conversation_log_fields(session_record_id, message_order, role, content, chunks)
+        return create_airtable_records("Conversation_Log", [fields])
         
-        # Prepare data for Conversation_Log
-        data = {
-            "fields": {
-                "message_order": message_order,
-                "role": "coach" if role == "assistant" else "player",
-                "message_content": content[:100000],
-                "coaching_resources_used": resource_count,
-                "resource_details": resource_details[:100000] if resource_details else ""
-            }
-        }
-        
-        # Add session_id link if we found the session record
-        if session_record_id:
-            data["fields"]["session_id"] = [session_record_id]
+    except Exception as e:
+        return False
+
+@st.cache_resource
+def get_log_executor():
+    """Background workers for chat logging so Airtable writes stay off the chat turn"""
+    executor = ThreadPoolExecutor(max_workers=2)
+    atexit.register(executor.shutdown, wait=True)
+    return executor
+
+def log_message_async(player_record_id: str, session_id: str, message_order: int, role: str, content: str, chunks=None):
+    """Queue the Active_Sessions and Conversation_Log writes for a message without waiting on them"""
+    executor = get_log_executor()
+    pending = st.session_state.setdefault('pending_log_writes', [])
+    pending[:] = [future for future in pending if not future.done()]
+    pending.append(executor.submit(log_message_to_sss, player_record_id, session_id, message_order, role, content, chunks))
+    pending.append(executor.submit(log_message_to_conversation_log, player_record_id, session_id, message_order, role, content, chunks))
+
+def wait_for_pending_logs(timeout: float = 15):
+    """Block until queued chat log writes have landed - needed before a session is closed out"""
+    pending = st.session_state.get('pending_log_writes', [])
+    wait(pending, timeout=timeout)
+    pending.clear()
+
+def record_chat_message(player_record_id: str, session_id: str, role: str, content: str, chunks=None):
+    """Number a chat message, add it to the transcript and queue its dual logging"""
+    st.session_state.message_counter += 1
+    st.session_state.messages.append({"role": role, "content": content})
+    if player_record_id:
+        log_message_async(player_record_id, session_id, st.session_state.message_counter, role, content, chunks)
+
+def log_welcome_messages(player_record_id: str, session_id: str, messages: list) -> bool:
+    """Log the opening coach messages as one batched write per table.
+    
+    messages is a list of (message_order, content) pairs. Active_Sessions is
+    written first because the Conversation_Log rows link to its record.
+    """
+    try:
+        sss_fields = [
+            build_sss_fields(player_record_id, session_id, message_order, "assistant", content)
+            for message_order, content in messages
+        ]
+        sss_logged = create_airtable_records("Active_Sessions", sss_fields)
         
-        response = requests.post(url, headers=headers, json=data)
-        return response.status_code == 200
+        session_record_id = find_session_record_id(session_id)
+        conv_fields = [
+            build_conversation_log_fields(session_record_id, message_order, "assistant", content)
+            for message_order, content in messages
+        ]
+        conv_logged = create_airtable_records("Conversation_Log", conv_fields)
+        return sss_logged and conv_logged
         
     except Exception as e:
         return False
@@ -1226,25 +1459,19 @@ def get_player_recent_summaries(player_record_id: str, limit: int = 3) -> list:
     Get recent summaries for a specific player - ORIGINAL WITH PLAYER FILTERING
     """
     try:
-        # First, get the player's email to match summaries
-        player_url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Players/{player_record_id}"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
-        
-        player_response = requests.get(player_url, headers=headers)
-        if player_response.status_code != 200:
-            return []
-            
-        player_email = player_response.json().get('fields', {}).get('email', '')
-        
-        # Get all summaries and find ones for this email
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Session_Summaries"
+        # Linked-record formulas only see the Players primary field, not record ids,
+        # so ownership is checked here - Airtable drops empty summaries and unused fields
+        url = f"{AIRTABLE_BASE_URL}/Session_Summaries"
         params = {
+            "filterByFormula": "{technical_focus} != ''",
             "sort[0][field]": "session_number", 
             "sort[0][direction]": "desc",
-            "maxRecords": 50  # Get more to search through
+            "maxRecords": 50,  # Get more to search through
+            "fields[]": ["player_id", "session_number", "technical_focus", "homework_assigned",
+                         "next_session_focus", "key_breakthroughs", "condensed_summary"]
         }
         
-        response = requests.get(url, headers=headers, params=params)
+        response = get_airtable_session().get(url, params=params, timeout=5)
         if response.status_code == 200:
             all_records = response.json().get('records', [])
             
@@ -1256,10 +1483,6 @@ def get_player_recent_summaries(player_record_id: str, limit: int = 3) -> list:
                 # NEW: Actually check if this summary belongs to our player
                 player_ids = fields.get('player_id', [])
                 if isinstance(player_ids, list) and player_record_id in player_ids:
-                    # Skip if no technical_focus (empty summary)
-                    if not fields.get('technical_focus'):
-                        continue
-                        
                     matching_summaries.append({
                         'session_number': fields.get('session_number', 0),
                         'technical_focus': fields.get('technical_focus', ''),
@@ -1268,6 +1491,8 @@ def get_player_recent_summaries(player_record_id: str, limit: int = 3) -> list:
                         'key_breakthroughs': fields.get('key_breakthroughs', ''),
                         'condensed_summary': fields.get('condensed_summary', '')
                     })
+                    if len(matching_summaries) == limit:
+                        break
             
             return matching_summaries[:limit]
         return []
@@ -1299,6 +1524,35 @@ def enhanced_generate_personalized_welcome_message(player_name: str, session_num
     return (greeting, followup)
 
 # ENHANCED: Build conversational prompt with coaching history
+def format_recent_conversation(messages: list, limit: int = 20) -> str:
+    """
+    "Player: ..." / "Coach Taai: ..." lines for the last `limit` messages.
+    Each message is formatted once and the lines are kept in session_state,
+    so a turn only formats the messages added since the last one.
+    """
+    if st.session_state.get('history_lines_source') is not messages:
+        st.session_state.history_lines_source = messages
+        st.session_state.history_lines = []
+    lines = st.session_state.history_lines
+    if len(lines) > len(messages):
+        lines.clear()
+    
+    for msg in messages[len(lines):]:
+        role = "Player" if msg['role'] == 'user' else "Coach Taai"
+        lines.append(f"{role}: {msg['content']}\n")
+    
+    return "".join(lines[-limit:])
+
+# Coaching notes left in resource text that must not reach the player; the full sentence comes before its "Wait for" prefix
+CHUNK_DEBUG_RE = re.compile("|".join(re.escape(pattern) for pattern in (
+    "Wait for player response before giving specific drill instruction",
+    "PATTERN 1", "PATTERN 2", "PATTERN 3",
+    "Internal note:", "Coach instruction:",
+    "DEBUG:", "Note to coach:", "Meta-commentary:",
+    "[Debug]", "[Internal]", "Coach note:",
+    "Wait for", "Before giving specific"
+)))
+
 def build_conversational_prompt_with_history(user_question: str, context_chunks: list, conversation_history: list, coaching_history: list = None, player_name: str = None, player_level: str = None) -> str:
     """Build Claude prompt with proper player context and memory"""
     
@@ -1309,7 +1563,7 @@ def build_conversational_prompt_with_history(user_question: str, context_chunks:
         # NEW PLAYER INTRODUCTION PROMPT
         intro_prompt = f"""You are Coach Taai. Be natural and conversational.
 
-{get_coaching_personality_enhancement()}
+{COACHING_PERSONALITY_ENHANCEMENT}
 
 INTRODUCTION FLOW:
 - Start: "Hi! I'm Coach Taai, your personal tennis coach. What's your name?"
@@ -1323,9 +1577,7 @@ Keep responses SHORT (1-2 sentences max). Be enthusiastic but concise."""
         history_text = ""
         if conversation_history:
             history_text = "\nCurrent conversation:\n"
-            for msg in conversation_history[-20:]:  # Last 20 exchanges
-                role = "Player" if msg['role'] == 'user' else "Coach Taai"
-                history_text += f"{role}: {msg['content']}\n"
+            history_text += format_recent_conversation(conversation_history)  # Last 20 exchanges
         
         # Clean context chunks of debug text
         cleaned_chunks = []
@@ -1334,17 +1586,7 @@ Keep responses SHORT (1-2 sentences max). Be enthusiastic but concise."""
                 content_text = chunk.get('text', '')
                 
                 # Remove debug patterns
-                debug_patterns = [
-                    "Wait for player response before giving specific drill instruction",
-                    "PATTERN 1", "PATTERN 2", "PATTERN 3",
-                    "Internal note:", "Coach instruction:",
-                    "DEBUG:", "Note to coach:", "Meta-commentary:",
-                    "[Debug]", "[Internal]", "Coach note:",
-                    "Wait for", "Before giving specific"
-                ]
-                
-                for pattern in debug_patterns:
-                    content_text = content_text.replace(pattern, "").strip()
+                content_text = CHUNK_DEBUG_RE.sub("", content_text).strip()
                 
                 # Only include if there's meaningful content left
                 if len(content_text.strip()) > 10:
@@ -1369,7 +1611,7 @@ Respond naturally as Coach Taai:"""
         
         coaching_prompt = f"""You are Coach Taai coaching {player_name or 'the player'}.
 
-{get_coaching_personality_enhancement()}
+{COACHING_PERSONALITY_ENHANCEMENT}
 
 {player_context}
 
@@ -1407,9 +1649,7 @@ Just give direct coaching advice."""
         # Add current conversation context
         if conversation_history and len(conversation_history) > 1:
             history_text += "\nCurrent session conversation:\n"
-            for msg in conversation_history[-20:]:  # Last 20 exchanges to maintain context
-                role = "Player" if msg['role'] == 'user' else "Coach Taai"
-                history_text += f"{role}: {msg['content']}\n"
+            history_text += format_recent_conversation(conversation_history)  # Last 20 exchanges to maintain context
         
         # Clean context chunks of debug text
         cleaned_chunks = []
@@ -1418,17 +1658,7 @@ Just give direct coaching advice."""
                 content_text = chunk.get('text', '')
                 
                 # Remove debug patterns
-                debug_patterns = [
-                    "Wait for player response before giving specific drill instruction",
-                    "PATTERN 1", "PATTERN 2", "PATTERN 3",
-                    "Internal note:", "Coach instruction:",
-                    "DEBUG:", "Note to coach:", "Meta-commentary:",
-                    "[Debug]", "[Internal]", "Coach note:",
-                    "Wait for", "Before giving specific"
-                ]
-                
-                for pattern in debug_patterns:
-                    content_text = content_text.replace(pattern, "").strip()
+                content_text = CHUNK_DEBUG_RE.sub("", content_text).strip()
                 
                 # Only include if there's meaningful content left
                 if len(content_text.strip()) > 10:
@@ -1445,29 +1675,30 @@ Player says: "{user_question}"
 
 Give direct coaching advice:"""
 
-def get_smart_coaching_response(prompt, index, claude_client, coaching_mode, top_k):
+def get_smart_coaching_prompt(prompt, index, coaching_mode, top_k):
     """
-    Smart coaching response with three modes:
+    Smart coaching prompt with three modes:
     - Auto: Pinecone+Claude with fallback to Claude-only if relevance < admin-set threshold (default 0.45)
     - Pinecone+Claude: Always use Pinecone
     - Claude Only: Never use Pinecone
+    Returns (claude_prompt, chunks) - the reply itself is streamed by the caller
     """
     
-    # Get player context
+    # Get player context - the profile lookup runs in the background so it overlaps Pinecone retrieval
     coaching_history = st.session_state.get('coaching_history', [])
-    player_name, player_level = get_current_player_info(st.session_state.get("player_record_id", ""))
+    profile_executor = ThreadPoolExecutor(max_workers=1)
+    player_info_future = profile_executor.submit(get_current_player_info, st.session_state.get("player_record_id", ""))
+    profile_executor.shutdown(wait=False)
     
     # Claude Only Mode
     if coaching_mode == "🧠 Claude Only":
         st.session_state.last_coaching_mode_used = "🧠 Claude-only mode active"
+        player_name, player_level = player_info_future.result()
         
         # Build Claude-only prompt
         recent_conversation = ""
         if len(st.session_state.messages) > 1:
-            recent_conversation = "\nCURRENT SESSION CONVERSATION:\n"
-            for msg in st.session_state.messages[20:]:
-                role = "Player" if msg['role'] == 'user' else "Coach Taai"
-                recent_conversation += f"{role}: {msg['content']}\n"
+            recent_conversation = "\nCURRENT SESSION CONVERSATION:\n" + format_recent_conversation(st.session_state.messages)
         
         session_context = ""
         if coaching_history and len(coaching_history) > 0 and len(st.session_state.messages) <= 4:
@@ -1478,7 +1709,7 @@ def get_smart_coaching_response(prompt, index, claude_client, coaching_mode, top
         
         claude_only_prompt = f"""You are Coach Taai, a professional tennis coach providing remote coaching advice through chat.
 
-{get_coaching_personality_enhancement()}
+{COACHING_PERSONALITY_ENHANCEMENT}
 
 Player: {player_name or 'the player'} (Level: {player_level or 'beginner'})
 
@@ -1507,13 +1738,13 @@ Player question: "{prompt}"
 
 Provide direct coaching advice:"""
 
-        response = query_claude(claude_client, claude_only_prompt)
-        return response, []
+        return claude_only_prompt, []
     
     # Pinecone modes (Auto or Always)
     else:
         # Query Pinecone
-        chunks = query_pinecone(index, prompt, top_k)
+        chunks = query_pinecone_cached(index, prompt, top_k)
+        player_name, player_level = player_info_future.result()
         
         # Check relevance for Auto mode
         if coaching_mode == "🤖 Auto (Smart Fallback)":
@@ -1529,9 +1760,7 @@ Provide direct coaching advice:"""
                 recent_conversation = ""
                 if len(st.session_state.messages) > 1:
                     recent_conversation = "\nCURRENT SESSION CONVERSATION:\n"
-                    for msg in st.session_state.messages[-20:]:
-                        role = "Player" if msg['role'] == 'user' else "Coach Taai"
-                        recent_conversation += f"{role}: {msg['content']}\n"
+                    recent_conversation += format_recent_conversation(st.session_state.messages)
                 
                 session_context = ""
                 if coaching_history and len(coaching_history) > 0 and len(st.session_state.messages) <= 4:
@@ -1542,7 +1771,7 @@ Provide direct coaching advice:"""
                 
                 claude_only_prompt = f"""You are Coach Taai, a professional tennis coach providing remote coaching advice through chat.
 
-{get_coaching_personality_enhancement()}
+{COACHING_PERSONALITY_ENHANCEMENT}
 
 Player: {player_name or 'the player'} (Level: {player_level or 'beginner'})
 
@@ -1566,8 +1795,7 @@ Player question: "{prompt}"
 
 Provide direct coaching advice:"""
 
-                response = query_claude(claude_client, claude_only_prompt)
-                return response, []
+                return claude_only_prompt, []
             
             else:
                 # Use relevant chunks
@@ -1583,14 +1811,14 @@ Provide direct coaching advice:"""
         prompt_with_context = build_conversational_prompt_with_history(
             prompt, chunks, st.session_state.messages, coaching_history, player_name, player_level
         )
-        response = query_claude(claude_client, prompt_with_context)
-        return response, chunks
+        return prompt_with_context, chunks
 
 def extract_name_from_response(user_message: str) -> str:
     """
     Enhanced name extraction - handles complex responses better
     """
     message = user_message.strip()
+    message_lower = message.lower()
     
     # Remove common trailing phrases that get captured
     trailing_phrases = [
@@ -1599,29 +1827,30 @@ def extract_name_from_response(user_message: str) -> str:
     ]
     
     for phrase in trailing_phrases:
-        if phrase in message.lower():
-            message = message[:message.lower().find(phrase)]
+        if phrase in message_lower:
+            message = message[:message_lower.find(phrase)]
+            message_lower = message.lower()
     
     # Handle common response patterns
-    if message.lower().startswith(("i'm ", "im ")):
+    if message_lower.startswith(("i'm ", "im ")):
         name = message.split(" ", 1)[1] if len(message.split()) > 1 else message
-    elif "i am " in message.lower():
+    elif "i am " in message_lower:
         # Find "i am" anywhere in the message and get the word after it
-        parts = message.lower().split("i am ")
+        parts = message_lower.split("i am ")
         if len(parts) > 1:
             name = parts[1].split()[0] if parts[1].split() else message
         else:
             name = message
-    elif "this is " in message.lower():
+    elif "this is " in message_lower:
         # Handle "this is [name]" pattern
-        parts = message.lower().split("this is ")
+        parts = message_lower.split("this is ")
         if len(parts) > 1:
             name = parts[1].split()[0] if parts[1].split() else message
         else:
             name = message
-    elif message.lower().startswith(("my name is ", "name is ")):
+    elif message_lower.startswith(("my name is ", "name is ")):
         name = message.split("is ", 1)[1] if "is " in message else message
-    elif message.lower().startswith(("call me ", "it's ", "its ")):
+    elif message_lower.startswith(("call me ", "it's ", "its ")):
         name = message.split(" ", 1)[1] if len(message.split()) > 1 else message
     else:
         # For simple responses like "Bak" or just a name
@@ -1646,15 +1875,15 @@ def extract_name_from_response(user_message: str) -> str:
 def calculate_days_since_last_session(player_record_id: str) -> int:
     """Calculate days since last session"""
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
         params = {
             "sort[0][field]": "timestamp",
             "sort[0][direction]": "desc",
-            "maxRecords": 50
+            "maxRecords": 50,
+            "fields[]": ["player_id", "timestamp"]
         }
         
-        response = requests.get(url, headers=headers, params=params)
+        response = get_airtable_session().get(url, params=params, timeout=5)
         if response.status_code == 200:
             records = response.json().get('records', [])
             
@@ -1666,7 +1895,7 @@ def calculate_days_since_last_session(player_record_id: str) -> int:
                     last_timestamp = fields.get('timestamp', '')
                     if last_timestamp:
                         try:
-                            last_dt = datetime.fromisoformat(last_timestamp.replace('Z', '+00:00'))
+                            last_dt = parse_airtable_timestamp(last_timestamp)
                             now_dt = datetime.now(last_dt.tzinfo)
                             days_diff = (now_dt - last_dt).days
                             return days_diff
@@ -1679,6 +1908,37 @@ def calculate_days_since_last_session(player_record_id: str) -> int:
         return 7
 
 
+# Tone indicators for analyze_session_tone
+POSITIVE_TONE_INDICATORS = [
+    'breakthrough', 'progress', 'improvement', 'great', 'excellent', 'good',
+    'clicked', 'got it', 'makes sense', 'comfortable', 'confident',
+    'working well', 'success', 'better', 'improved', 'solid'
+]
+
+CHALLENGING_TONE_INDICATORS = [
+    'struggle', 'difficult', 'frustrating', 'hard time', 'trouble',
+    'inconsistent', 'issues', 'problems', 'challenging', 'tough',
+    'need work', 'focus on', 'fix', 'work on'
+]
+
+TECHNICAL_TONE_INDICATORS = [
+    'grip', 'stance', 'follow-through', 'technique', 'mechanics',
+    'form', 'adjustment', 'forehand', 'backhand', 'serve', 'volley',
+    'footwork', 'swing', 'contact', 'timing'
+]
+
+# Punctuation is stripped from both the text and the indicators before matching
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+def compile_tone_indicators(indicators: list):
+    """Whole-word alternation (plural 's' allowed) over punctuation-free indicators"""
+    cleaned = (indicator.translate(PUNCTUATION_TABLE) for indicator in indicators)
+    return re.compile(r'\b(' + '|'.join(map(re.escape, cleaned)) + r')s?\b')
+
+POSITIVE_TONE_RE = compile_tone_indicators(POSITIVE_TONE_INDICATORS)
+CHALLENGING_TONE_RE = compile_tone_indicators(CHALLENGING_TONE_INDICATORS)
+TECHNICAL_TONE_RE = compile_tone_indicators(TECHNICAL_TONE_INDICATORS)
+
 def analyze_session_tone(session_summary: dict) -> str:
     """Analyze the tone/mood of the last session"""
     if not session_summary:
@@ -1689,34 +1949,18 @@ def analyze_session_tone(session_summary: dict) -> str:
         session_summary.get('key_breakthroughs', ''),
         session_summary.get('mental_game_notes', ''),
         session_summary.get('condensed_summary', '')
-    ]).lower()
+    ])
     
     if not all_text.strip():
         return "neutral"
     
-    # Define tone indicators
-    positive_indicators = [
-        'breakthrough', 'progress', 'improvement', 'great', 'excellent', 'good',
-        'clicked', 'got it', 'makes sense', 'comfortable', 'confident',
-        'working well', 'success', 'better', 'improved', 'solid'
-    ]
+    # Lowercase and strip punctuation once, only when there is text to scan
+    clean_text = all_text.lower().translate(PUNCTUATION_TABLE)
     
-    challenging_indicators = [
-        'struggle', 'difficult', 'frustrating', 'hard time', 'trouble',
-        'inconsistent', 'issues', 'problems', 'challenging', 'tough',
-        'need work', 'focus on', 'fix', 'work on'
-    ]
-    
-    technical_indicators = [
-        'grip', 'stance', 'follow-through', 'technique', 'mechanics',
-        'form', 'adjustment', 'forehand', 'backhand', 'serve', 'volley',
-        'footwork', 'swing', 'contact', 'timing'
-    ]
-    
-    # Count indicators
-    positive_count = sum(1 for indicator in positive_indicators if indicator in all_text)
-    challenging_count = sum(1 for indicator in challenging_indicators if indicator in all_text)
-    technical_count = sum(1 for indicator in technical_indicators if indicator in all_text)
+    # Count distinct indicators present
+    positive_count = len(set(POSITIVE_TONE_RE.findall(clean_text)))
+    challenging_count = len(set(CHALLENGING_TONE_RE.findall(clean_text)))
+    technical_count = len(set(TECHNICAL_TONE_RE.findall(clean_text)))
     
     # Determine primary tone
     if positive_count >= 2 and positive_count > challenging_count:
@@ -1729,77 +1973,88 @@ def analyze_session_tone(session_summary: dict) -> str:
         return "neutral"
 
 
+# Greeting category decision table, checked in priority order:
+# time since last visit first, then last-session tone, then session frequency
+GREETING_CATEGORY_TABLE = [
+    (lambda days, tone, sessions: days == 0, "same_day"),
+    (lambda days, tone, sessions: days == 1, "next_day"),
+    (lambda days, tone, sessions: days >= 21, "long_absence"),
+    (lambda days, tone, sessions: days >= 10, "absence"),
+    (lambda days, tone, sessions: tone == "positive", "positive"),
+    (lambda days, tone, sessions: tone == "challenging", "challenging"),
+    (lambda days, tone, sessions: tone == "technical", "technical"),
+    (lambda days, tone, sessions: sessions >= 8, "frequent"),
+    (lambda days, tone, sessions: sessions <= 3, "new"),
+    (lambda days, tone, sessions: True, "regular"),
+]
+
+GREETING_TEMPLATES = {
+    "same_day": (
+        "Back already, {name}! How's it going?",
+        "Twice in one day, {name} - I love the dedication!",
+        "Ready for round two, {name}?"
+    ),
+    "next_day": (
+        "Back for more, {name}! How are you feeling?",
+        "Day two, {name}! How's everything feeling?",
+        "Love the commitment, {name} - ready to keep working?"
+    ),
+    "long_absence": (
+        "{name}! Wow, it's been a while - how have you been?",
+        "Hey {name}! Great to see you back after so long!",
+        "{name}! Good to have you back - how's life been?"
+    ),
+    "absence": (
+        "{name}! Great to have you back!",
+        "Hey {name}! It's been a while - how have you been?",
+        "{name}! Good to see you again!"
+    ),
+    "positive": (
+        "Hey {name}! Still feeling good about that progress?",
+        "{name}! How's that confidence been?",
+        "Hi {name}! I bet you've been thinking about that breakthrough!"
+    ),
+    "challenging": (
+        "Hey {name}! How are you feeling today?",
+        "{name}! Ready to tackle some tennis?",
+        "Hi {name}! How's everything been going?"
+    ),
+    "technical": (
+        "Hey {name}! How's that technique been working out?",
+        "{name}! Have you been practicing what we worked on?",
+        "Hi {name}! How's that adjustment feeling?"
+    ),
+    "frequent": (
+        "Hey {name}! Love seeing you back so consistently!",
+        "{name}! Your dedication is impressive - how are you feeling?",
+        "Hi {name}! Ready for another great session?"
+    ),
+    "new": (
+        "Hey {name}! Good to see you back!",
+        "{name}! Nice to see you're staying with it!",
+        "Hi {name}! How has tennis been treating you?"
+    ),
+    "regular": (
+        "Hey {name}! How's it going?",
+        "{name}! Good to see you again!",
+        "Hi {name}! How have you been?"
+    ),
+}
+
+# How many recent greetings are remembered to avoid repeating one
+RECENT_GREETINGS_KEPT = 3
+
 def generate_smart_greeting(player_name: str, days_since: int, session_tone: str, total_sessions: int) -> str:
     """Generate context-aware greeting"""
     
-    # Time-based greetings (highest priority)
-    if days_since == 0:
-        greetings = [
-            f"Back already, {player_name}! How's it going?",
-            f"Twice in one day, {player_name} - I love the dedication!",
-            f"Ready for round two, {player_name}?"
-        ]
-    elif days_since == 1:
-        greetings = [
-            f"Back for more, {player_name}! How are you feeling?",
-            f"Day two, {player_name}! How's everything feeling?",
-            f"Love the commitment, {player_name} - ready to keep working?"
-        ]
-    elif days_since >= 21:
-        greetings = [
-            f"{player_name}! Wow, it's been a while - how have you been?",
-            f"Hey {player_name}! Great to see you back after so long!",
-            f"{player_name}! Good to have you back - how's life been?"
-        ]
-    elif days_since >= 10:
-        greetings = [
-            f"{player_name}! Great to have you back!",
-            f"Hey {player_name}! It's been a while - how have you been?",
-            f"{player_name}! Good to see you again!"
-        ]
-    else:
-        # Recent visits - tone-based greetings
-        if session_tone == "positive":
-            greetings = [
-                f"Hey {player_name}! Still feeling good about that progress?",
-                f"{player_name}! How's that confidence been?",
-                f"Hi {player_name}! I bet you've been thinking about that breakthrough!"
-            ]
-        elif session_tone == "challenging":
-            greetings = [
-                f"Hey {player_name}! How are you feeling today?",
-                f"{player_name}! Ready to tackle some tennis?",
-                f"Hi {player_name}! How's everything been going?"
-            ]
-        elif session_tone == "technical":
-            greetings = [
-                f"Hey {player_name}! How's that technique been working out?",
-                f"{player_name}! Have you been practicing what we worked on?",
-                f"Hi {player_name}! How's that adjustment feeling?"
-            ]
-        else:
-            # Default based on session frequency
-            if total_sessions >= 8:
-                greetings = [
-                    f"Hey {player_name}! Love seeing you back so consistently!",
-                    f"{player_name}! Your dedication is impressive - how are you feeling?",
-                    f"Hi {player_name}! Ready for another great session?"
-                ]
-            elif total_sessions <= 3:
-                greetings = [
-                    f"Hey {player_name}! Good to see you back!",
-                    f"{player_name}! Nice to see you're staying with it!",
-                    f"Hi {player_name}! How has tennis been treating you?"
-                ]
-            else:
-                greetings = [
-                    f"Hey {player_name}! How's it going?",
-                    f"{player_name}! Good to see you again!",
-                    f"Hi {player_name}! How have you been?"
-                ]
+    category = next(
+        category for matches, category in GREETING_CATEGORY_TABLE
+        if matches(days_since, session_tone, total_sessions)
+    )
+    greetings = [template.format(name=player_name) for template in GREETING_TEMPLATES[category]]
     
     # Get stored recent greetings to avoid repetition
-    recent_greetings = st.session_state.get('recent_greetings', [])
+    recent_greetings = st.session_state.setdefault('recent_greetings', deque(maxlen=RECENT_GREETINGS_KEPT))
     
     # Filter out recently used greetings
     available = [g for g in greetings if g not in recent_greetings]
@@ -1811,12 +2066,14 @@ def generate_smart_greeting(player_name: str, days_since: int, session_tone: str
     # Pick the first available and store it
     selected_greeting = available[0]
     
-    # Update recent greetings (keep last 3)
+    # Update recent greetings (the deque keeps the last 3)
     recent_greetings.append(selected_greeting)
-    st.session_state.recent_greetings = recent_greetings[-3:]
     
     return selected_greeting
 
+# Technique words worth calling out in a follow-up (prefix match, so "serves" counts)
+FOLLOWUP_TECH_RE = re.compile(r'\b(forehand|backhand|serve|volley|grip|stance|footwork)', re.IGNORECASE)
+
 def generate_followup_message(player_name: str, last_session_summary: dict, session_tone: str) -> str:
     """Generate specific follow-up based on last session priority"""
     
@@ -1826,48 +2083,32 @@ def generate_followup_message(player_name: str, last_session_summary: dict, sess
     # Priority 1: Homework/practice check
     homework = last_session_summary.get('homework_assigned', '').strip()
     if homework and len(homework) > 10:  # Meaningful homework content
-        if len(homework) > 60:
-            homework_preview = homework[:60] + "..."
-        else:
-            homework_preview = homework
+        homework_preview = truncate_text(homework, 60)
         return f"Did you get a chance to practice what we discussed? {homework_preview} How did it go?"
     
     # Priority 2: Breakthrough follow-up (only if positive tone)
     breakthroughs = last_session_summary.get('key_breakthroughs', '').strip()
     if breakthroughs and len(breakthroughs) > 10 and session_tone == "positive":
-        if len(breakthroughs) > 50:
-            breakthrough_preview = breakthroughs[:50] + "..."
-        else:
-            breakthrough_preview = breakthroughs
+        breakthrough_preview = truncate_text(breakthroughs, 50)
         return f"How has that breakthrough been working out? {breakthrough_preview}"
     
     # Priority 3: Next session focus
     next_focus = last_session_summary.get('next_session_focus', '').strip()
     if next_focus and len(next_focus) > 10:
-        if len(next_focus) > 55:
-            focus_preview = next_focus[:55] + "..."
-        else:
-            focus_preview = next_focus
+        focus_preview = truncate_text(next_focus, 55)
         return f"Ready to work on what we planned? {focus_preview}"
     
     # Priority 4: Technical follow-up
     technical_focus = last_session_summary.get('technical_focus', '').strip()
     if technical_focus and len(technical_focus) > 10:
         # Look for specific technique mentions
-        tech_words = ["forehand", "backhand", "serve", "volley", "grip", "stance", "footwork"]
-        mentioned_tech = None
-        for tech in tech_words:
-            if tech in technical_focus.lower():
-                mentioned_tech = tech
-                break
+        tech_match = FOLLOWUP_TECH_RE.search(technical_focus)
+        mentioned_tech = tech_match.group(1).lower() if tech_match else None
         
         if mentioned_tech:
             return f"How has that {mentioned_tech} work been going since last time?"
         else:
-            if len(technical_focus) > 45:
-                tech_preview = technical_focus[:45] + "..."
-            else:
-                tech_preview = technical_focus
+            tech_preview = truncate_text(technical_focus, 45)
             return f"How has the work on {tech_preview.lower()} been going?"
     
     # Priority 5: Mental game follow-up
@@ -1885,20 +2126,19 @@ def setup_player_session_with_continuity(player_email: str):
     # Clean up any abandoned sessions first (silent cleanup)
     try:
         # Run cleanup silently in background - don't show messages to user
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
         
         # Find sessions older than 15 minutes that are still "active"
-        from datetime import datetime, timedelta
         cutoff_time = (datetime.now() - timedelta(minutes=15)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
         
         params = {
             "filterByFormula": f"AND({{session_status}} = 'active', {{timestamp}} < '{cutoff_time}')",
             "sort[0][field]": "session_id",
-            "sort[0][direction]": "desc"
+            "sort[0][direction]": "desc",
+            "fields[]": ["session_id", "message_content", "player_id"]
         }
         
-        response = requests.get(url, headers=headers, params=params)
+        response = get_airtable_session().get(url, params=params, timeout=5)
         if response.status_code == 200:
             all_abandoned_records = response.json().get('records', [])
             
@@ -2001,6 +2241,76 @@ def setup_player_session_with_continuity(player_email: str):
             st.error("Error creating player profile. Please try again.")
             return None
 
+# Level-assessment indicator flags - one bit per keyword category
+LEVEL_BEGINNER = 0x01
+LEVEL_REGULAR_PLAY = 0x02
+LEVEL_OCCASIONAL_PLAY = 0x04
+LEVEL_LESSONS = 0x08
+LEVEL_NO_LESSONS = 0x10
+LEVEL_EXPERIENCE = 0x20
+LEVEL_ADVANCED_CONCEPT = 0x40
+
+LEVEL_INDICATORS = {
+    LEVEL_BEGINNER: [
+        "just started", "new to tennis", "beginner", "never played",
+        "first time", "starting out", "very new", "complete beginner"
+    ],
+    LEVEL_REGULAR_PLAY: [
+        "weekly", "twice a week", "regularly", "every week",
+        "few times a month", "often", "frequent"
+    ],
+    LEVEL_OCCASIONAL_PLAY: [
+        "occasionally", "sometimes", "not often", "when i can",
+        "here and there", "once in a while", "rarely"
+    ],
+    LEVEL_LESSONS: [
+        "lessons", "coach", "instructor", "teaching", "coached",
+        "take lessons", "have a coach", "work with"
+    ],
+    LEVEL_NO_LESSONS: [
+        "no lessons", "no coach", "never had lessons", "self taught",
+        "just with friends", "on my own"
+    ],
+    LEVEL_EXPERIENCE: [
+        "experience", "played before", "been playing", "familiar with",
+        "know the basics", "comfortable with"
+    ],
+    LEVEL_ADVANCED_CONCEPT: [
+        "strategy", "tactics", "consistency", "power", "spin",
+        "serve", "volley", "backhand", "forehand"
+    ],
+}
+
+def build_level_phrase_flags(indicators: dict) -> dict:
+    """Map each indicator phrase to its flags plus those of every shorter phrase it contains"""
+    phrase_flags = {}
+    for flag, phrases in indicators.items():
+        for phrase in phrases:
+            phrase_flags[phrase] = phrase_flags.get(phrase, 0) | flag
+    for phrase in phrase_flags:
+        for other, flag in list(phrase_flags.items()):
+            if other != phrase and other in phrase:
+                phrase_flags[phrase] |= flag
+    return phrase_flags
+
+LEVEL_PHRASE_FLAGS = build_level_phrase_flags(LEVEL_INDICATORS)
+
+# A capturing lookahead tries every start position, so overlapping phrases
+# ("played before" / "forehand" in "played beforehand") are all seen; with the
+# longest phrase captured at each position and the contained-phrase flags above,
+# this sets the same bits as checking every phrase with `in`
+LEVEL_PHRASE_RE = re.compile(
+    "(?=(" + "|".join(re.escape(p) for p in sorted(LEVEL_PHRASE_FLAGS, key=len, reverse=True)) + "))"
+)
+
+# "Less than a year" style time spans that mark a beginner
+LESS_THAN_YEAR_RE = re.compile(
+    r"less than.*year|under.*year|not even.*year|few months|couple.*months|\d+.*months"
+)
+MONTH_COUNT_RE = re.compile(r'(\d+)\s*months?')
+# "about 3 years", "over 2 yrs" etc. all reduce to the number before the unit
+YEAR_COUNT_RE = re.compile(r'(\d+)\s*(?:years?|yrs?)')
+
 def assess_player_level_from_conversation(conversation_history: list, claude_client) -> str:
     """
     Simple conversational assessment - when in doubt, default to Beginner
@@ -2017,45 +2327,30 @@ def assess_player_level_from_conversation(conversation_history: list, claude_cli
     # Combine all tennis-related responses (skip first which is usually name)
     all_responses = " ".join(player_responses[1:]).lower()
     
-    # STEP 1: Check for explicit beginner indicators
-    beginner_phrases = [
-        "just started", "new to tennis", "beginner", "never played", 
-        "first time", "starting out", "very new", "complete beginner"
-    ]
+    # Classify every indicator phrase in one pass over the text
+    mask = 0
+    for match in LEVEL_PHRASE_RE.finditer(all_responses):
+        mask |= LEVEL_PHRASE_FLAGS[match.group(1)]
     
-    if any(phrase in all_responses for phrase in beginner_phrases):
+    # STEP 1: Check for explicit beginner indicators
+    if mask & LEVEL_BEGINNER:
         return "Beginner"
     
     # STEP 2: Look for time indicators  
-    import re
     
     # Look for "less than" patterns that indicate beginner
-    less_than_patterns = [
-        r"less than.*year", r"under.*year", r"not even.*year",
-        r"few months", r"couple.*months", r"\d+.*months"
-    ]
-    
-    if any(re.search(pattern, all_responses) for pattern in less_than_patterns):
+    if LESS_THAN_YEAR_RE.search(all_responses):
         return "Beginner"
     
     # Look for specific month mentions (if 6 months or less = beginner)
-    month_numbers = re.findall(r'(\d+)\s*months?', all_responses)
+    month_numbers = MONTH_COUNT_RE.findall(all_responses)
     if month_numbers:
         max_months = max(int(month) for month in month_numbers)
         if max_months < 12:  # Less than a year
             return "Beginner"
     
     # STEP 3: Look for year indicators
-    year_patterns = [
-        r'(\d+)\s*years?', r'(\d+)\s*yrs?', 
-        r'about\s*(\d+)\s*years?', r'around\s*(\d+)\s*years?',
-        r'over\s*(\d+)\s*years?', r'more than\s*(\d+)\s*years?'
-    ]
-    
-    years_mentioned = []
-    for pattern in year_patterns:
-        matches = re.findall(pattern, all_responses)
-        years_mentioned.extend([int(match) for match in matches])
+    years_mentioned = [int(match) for match in YEAR_COUNT_RE.findall(all_responses)]
     
     # If less than 1 year mentioned, still beginner
     if years_mentioned and max(years_mentioned) < 1:
@@ -2063,33 +2358,10 @@ def assess_player_level_from_conversation(conversation_history: list, claude_cli
     
     # STEP 4: If 1+ years mentioned, check frequency and lessons
     if years_mentioned and max(years_mentioned) >= 1:
-        
-        # Check for regular play indicators
-        regular_play_indicators = [
-            "weekly", "twice a week", "regularly", "every week",
-            "few times a month", "often", "frequent"
-        ]
-        
-        occasional_play_indicators = [
-            "occasionally", "sometimes", "not often", "when i can",
-            "here and there", "once in a while", "rarely"
-        ]
-        
-        # Check for lesson indicators
-        lesson_indicators = [
-            "lessons", "coach", "instructor", "teaching", "coached",
-            "take lessons", "have a coach", "work with"
-        ]
-        
-        no_lesson_indicators = [
-            "no lessons", "no coach", "never had lessons", "self taught",
-            "just with friends", "on my own"
-        ]
-        
-        has_regular_play = any(indicator in all_responses for indicator in regular_play_indicators)
-        has_occasional_play = any(indicator in all_responses for indicator in occasional_play_indicators)
-        has_lessons = any(indicator in all_responses for indicator in lesson_indicators)
-        no_lessons = any(indicator in all_responses for indicator in no_lesson_indicators)
+        has_regular_play = mask & LEVEL_REGULAR_PLAY
+        has_occasional_play = mask & LEVEL_OCCASIONAL_PLAY
+        has_lessons = mask & LEVEL_LESSONS
+        no_lessons = mask & LEVEL_NO_LESSONS
         
         # Decision logic for 1+ year players
         if has_regular_play and has_lessons:
@@ -2106,35 +2378,39 @@ def assess_player_level_from_conversation(conversation_history: list, claude_cli
             return "Intermediate"
     
     # STEP 5: Look for other experience indicators if no clear time mentioned
-    experience_indicators = [
-        "experience", "played before", "been playing", "familiar with",
-        "know the basics", "comfortable with"
-    ]
-    
-    if any(indicator in all_responses for indicator in experience_indicators):
-        # Some experience mentioned but unclear - check for advanced concepts
-        advanced_concepts = [
-            "strategy", "tactics", "consistency", "power", "spin",
-            "serve", "volley", "backhand", "forehand"
-        ]
-        
-        if any(concept in all_responses for concept in advanced_concepts):
-            return "Intermediate"
+    # Some experience mentioned but unclear - check for advanced concepts
+    if mask & LEVEL_EXPERIENCE and mask & LEVEL_ADVANCED_CONCEPT:
+        return "Intermediate"
     
     # DEFAULT: When in doubt, return Beginner
     return "Beginner"
 
-def analyze_tennis_experience(user_message: str, question_context: str) -> str:
-    """
-    Use AI to determine player's tennis skill level
-    Returns: 'BEGINNER', 'INTERMEDIATE', 'ADVANCED', or 'UNCLEAR'
-    """
-    try:
-        analysis_prompt = f"""
-The tennis coach asked: "{question_context}"
-Player responded: "{user_message}"
-
-Determine the player's tennis skill level:
+# Clear-cut experience cues in an intro reply, checked before asking Claude
+EXPERIENCE_LEVEL_PATTERNS = (
+    ("BEGINNER", re.compile(
+        r"\b(?:new to (?:tennis|the game|it)|just (?:started|starting|picked)|beginner|novice|never played|"
+        r"first time|(?:a )?(?:few|couple(?: of)?) months|(?:[1-9]|1[01]) months?)\b", re.IGNORECASE)),
+    ("INTERMEDIATE", re.compile(
+        # "a year" only counts unqualified - "less than a year" is a beginner span
+        r"\b(?:intermediate|(?<!than )(?<!under )(?<!half )(?<!even )(?:a|one|1|two|2|three|3|a couple of|a few) years?|"
+        r"play (?:regularly|every week|weekly)|"
+        r"(?:once|twice|a few times) a week|league)\b", re.IGNORECASE)),
+    ("ADVANCED", re.compile(
+        r"\b(?:advanced|tournaments?|competitive(?:ly)?|college tennis|varsity|ranked|ntrp [4-7]|"
+        r"\d{2,} years|many years|decades?)\b", re.IGNORECASE)),
+)
+# Time spans under a year, checked before the negation guard since "not even a year" is still a beginner
+EXPERIENCE_UNDER_A_YEAR_RE = re.compile(
+    r"\b(?:(?:less than|under|not even|about|around|only|just) )?half a year\b|"
+    r"\b(?:less than|under|not even|not quite|almost|nearly) (?:a|one|1) (?:full )?year\b", re.IGNORECASE
+)
+# Negated replies ("not a beginner") are left to Claude
+EXPERIENCE_NEGATION_RE = re.compile(r"\b(?:not|no|don't|haven't|isn't|wasn't)\b", re.IGNORECASE)
+AFFIRMATIVE_REPLY_RE = re.compile(r"^\s*(?:yes|yeah|yep|yup|definitely|totally|pretty much)\b", re.IGNORECASE)
+
+# Static rubric sent as the system block. It is marked cache_control, but caching stays inactive
+# until the prefix passes the model's minimum cacheable length - this rubric is well below it
+EXPERIENCE_RUBRIC = """You classify a tennis player's skill level from their reply to the coach.
 
 BEGINNER: New to tennis, just started, novice, never played, few months experience
 INTERMEDIATE: Been playing for a while, has some experience, plays regularly, 1+ years
@@ -2143,19 +2419,46 @@ UNCLEAR: Response doesn't clearly indicate skill level
 
 Most players fall into BEGINNER or INTERMEDIATE categories.
 
-Respond with exactly one word: BEGINNER, INTERMEDIATE, ADVANCED, or UNCLEAR
-"""
+Respond with exactly one word: BEGINNER, INTERMEDIATE, ADVANCED, or UNCLEAR"""
+
+EXPERIENCE_LEVELS = frozenset({"BEGINNER", "INTERMEDIATE", "ADVANCED", "UNCLEAR"})
+
+def classify_experience_locally(user_message: str, question_context: str):
+    """Skill level from keyword cues when exactly one level is indicated, else None"""
+    if EXPERIENCE_UNDER_A_YEAR_RE.search(user_message):
+        return "BEGINNER"
+    if EXPERIENCE_NEGATION_RE.search(user_message):
+        return None
+    
+    scores = {label: len(pattern.findall(user_message)) for label, pattern in EXPERIENCE_LEVEL_PATTERNS}
+    # "Yes" to "are you pretty new to tennis?" is a beginner answer
+    if "new to tennis" in question_context and AFFIRMATIVE_REPLY_RE.match(user_message):
+        scores["BEGINNER"] += 1
+    
+    (top_label, top_score), (_, runner_up_score) = sorted(scores.items(), key=itemgetter(1), reverse=True)[:2]
+    return top_label if top_score > runner_up_score else None
 
-        _, claude_client = setup_connections()
+def analyze_tennis_experience(user_message: str, question_context: str, claude_client) -> str:
+    """
+    Use AI to determine player's tennis skill level
+    Returns: 'BEGINNER', 'INTERMEDIATE', 'ADVANCED', or 'UNCLEAR'
+    """
+    try:
+        # Most replies name their level outright - only ambiguous ones need Claude
+        local_level = classify_experience_locally(user_message, question_context)
+        if local_level:
+            return local_level
+        
         if claude_client:
             response = claude_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
+                model="claude-3-5-haiku-20241022",
                 max_tokens=10,
-                messages=[{"role": "user", "content": analysis_prompt}]
+                system=[{"type": "text", "text": EXPERIENCE_RUBRIC, "cache_control": {"type": "ephemeral"}}],
+                messages=[{"role": "user", "content": f'The tennis coach asked: "{question_context}"\nPlayer responded: "{user_message}"'}]
             )
             
             analysis = response.content[0].text.strip().upper()
-            if analysis in ["BEGINNER", "INTERMEDIATE", "ADVANCED", "UNCLEAR"]:
+            if analysis in EXPERIENCE_LEVELS:
                 return analysis
         
         # Fallback - most players are beginners
@@ -2178,7 +2481,7 @@ def handle_introduction_sequence(user_message: str, claude_client):
             return f"Nice to meet you, {player_name}! I'm excited to coach you. Tell me, are you pretty new to tennis?"
     
     elif intro_state == "checking_experience":
-        skill_level = analyze_tennis_experience(user_message, "are you pretty new to tennis?")
+        skill_level = analyze_tennis_experience(user_message, "are you pretty new to tennis?", claude_client)
         
         if skill_level == "BEGINNER":
             success = update_player_info(
@@ -2216,7 +2519,7 @@ def handle_introduction_sequence(user_message: str, claude_client):
     
     elif intro_state == "asking_time":
         # Use AI to analyze their detailed response
-        skill_level = analyze_tennis_experience(user_message, "tell me about your tennis journey")
+        skill_level = analyze_tennis_experience(user_message, "tell me about your tennis journey", claude_client)
         
         success = update_player_info(
             st.session_state.player_record_id,
@@ -2236,13 +2539,13 @@ def handle_introduction_sequence(user_message: str, claude_client):
     
     return None
 
+@st.cache_data(ttl=30, show_spinner=False)
 def get_current_player_info(player_record_id: str) -> tuple:
     """Retrieve current player name and level from database"""
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Players/{player_record_id}"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        url = f"{AIRTABLE_BASE_URL}/Players/{player_record_id}"
         
-        response = requests.get(url, headers=headers)
+        response = get_airtable_session().get(url, timeout=5)
         if response.status_code == 200:
             fields = response.json().get('fields', {})
             name = fields.get('name', '')
@@ -2252,92 +2555,92 @@ def get_current_player_info(player_record_id: str) -> tuple:
     except Exception as e:
         return '', ''
 
+# Comprehensive email regex pattern
+# Handles: username+tags@subdomain.domain.extension
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9][a-zA-Z0-9._%+-]*[a-zA-Z0-9]@[a-zA-Z0-9][a-zA-Z0-9.-]*[a-zA-Z0-9]\.[a-zA-Z]{2,}$')
+
 def is_valid_email(email: str) -> bool:
     """
     Robust email validation using regex pattern
     Future-proof and handles international domains
+    
+    - Username starts and ends with a letter or digit and may contain . _ % + - in between
+    - Domain starts and ends with a letter or digit and may contain dots and hyphens
+    - Extension after the final dot is at least 2 letters
     """
-    import re
-    
-    # Comprehensive email regex pattern
-    # Handles: username+tags@subdomain.domain.extension
-    pattern = r'''
-        ^                       # Start of string
-        [a-zA-Z0-9]             # First character must be alphanumeric
-        [a-zA-Z0-9._%+-]*       # Username can contain letters, numbers, dots, underscores, percent, plus, hyphen
-        [a-zA-Z0-9]             # Last character of username must be alphanumeric
-        @                       # Required @ symbol
-        [a-zA-Z0-9]             # Domain must start with alphanumeric
-        [a-zA-Z0-9.-]*          # Domain can contain letters, numbers, dots, hyphens
-        [a-zA-Z0-9]             # Domain must end with alphanumeric
-        \.                      # Required dot before extension
-        [a-zA-Z]{2,}            # Extension must be at least 2 letters
-        $                       # End of string
-    '''
-    
-    return re.match(pattern, email.strip(), re.VERBOSE) is not None
+    return EMAIL_RE.match(email.strip()) is not None
+
+# Words in the player's messages that map to a technique worked on this session
+SESSION_TECHNIQUE_MAP = {
+    'forehand': 'forehand',
+    'backhand': 'backhand',
+    'serve': 'serve',
+    'serving': 'serve',
+    'volley': 'volleys',
+    'net': 'volleys',
+    'footwork': 'footwork',
+    'movement': 'footwork'
+}
+SESSION_TECHNIQUE_ORDER = ['forehand', 'backhand', 'serve', 'volleys', 'footwork']
+SESSION_TECHNIQUE_RE = re.compile(r'\b(' + '|'.join(SESSION_TECHNIQUE_MAP) + r')s?\b')
+
+# Session ending phrase pools - {name} is ", <player name>" or empty, {technique_work} the techniques covered
+# Effort acknowledgments (varied)
+ENDING_EFFORT_PHRASES = (
+    "Love your commitment today{name}!",
+    "You really focused on the details today - that's how improvement happens!",
+    "Great questions today{name} - shows you're thinking like a player!",
+    "I can see you're putting in the mental work - that's just as important as physical practice!",
+    "Your dedication to getting better really shows!"
+)
+
+# Learning/challenge acknowledgments
+ENDING_TECHNIQUE_LEARNING_PHRASES = (
+    "Working on {technique_work} takes patience - you're on the right track!",
+    "Those {technique_work} adjustments we discussed will click with practice!",
+    "Remember, mastering {technique_work} is a process - every rep counts!",
+    "The {technique_work} work we covered today will pay off on court!"
+)
+
+ENDING_GENERAL_LEARNING_PHRASES = (
+    "The concepts we covered today will make more sense as you practice them!",
+    "Breaking down technique like this is how real improvement happens!",
+    "Those adjustments take time to feel natural - trust the process!",
+    "Every detail we discussed today builds toward better tennis!"
+)
+
+# Motivational closings
+ENDING_MOTIVATION_PHRASES = (
+    "Keep that curiosity and drive - it's your biggest asset! 🎾",
+    "You've got the right mindset to take your game to the next level! 🎾",
+    "Stay patient with yourself and trust the process - you're improving! 🎾",
+    "That focus you showed today is what separates good players from great ones! 🎾",
+    "Keep asking great questions and putting in the work - exciting progress ahead! 🎾"
+)
 
 def generate_dynamic_session_ending(conversation_history: list, player_name: str = "") -> str:
     """
     Generate personalized, varied session ending messages focused on effort, learning, and motivation
     """
-    import random
-    
-    # Analyze the session to personalize the message
-    session_content = " ".join([msg['content'].lower() for msg in conversation_history if msg['role'] == 'user'])
-    
-    # Detect what they worked on
-    techniques = []
-    if any(word in session_content for word in ['forehand', 'forehand']):
-        techniques.append('forehand')
-    if any(word in session_content for word in ['backhand', 'backhand']):
-        techniques.append('backhand')
-    if any(word in session_content for word in ['serve', 'serving']):
-        techniques.append('serve')
-    if any(word in session_content for word in ['volley', 'net']):
-        techniques.append('volleys')
-    if any(word in session_content for word in ['footwork', 'movement']):
-        techniques.append('footwork')
-    
-    # Effort acknowledgments (varied)
-    effort_phrases = [
-        f"Love your commitment today{f', {player_name}' if player_name else ''}!",
-        "You really focused on the details today - that's how improvement happens!",
-        f"Great questions today{f', {player_name}' if player_name else ''} - shows you're thinking like a player!",
-        "I can see you're putting in the mental work - that's just as important as physical practice!",
-        "Your dedication to getting better really shows!"
-    ]
+    # Detect what they worked on, scanning the player's messages one at a time
+    mentioned = set()
+    for msg in conversation_history:
+        if msg['role'] != 'user':
+            continue
+        for match in SESSION_TECHNIQUE_RE.finditer(msg['content'].lower()):
+            mentioned.add(SESSION_TECHNIQUE_MAP[match.group(1)])
+    techniques = [technique for technique in SESSION_TECHNIQUE_ORDER if technique in mentioned]
+    
+    # Pick one phrase from each pool, then fill in only the chosen ones
+    effort = random.choice(ENDING_EFFORT_PHRASES).format(name=f", {player_name}" if player_name else "")
     
-    # Learning/challenge acknowledgments
     if techniques:
         technique_work = techniques[0] if len(techniques) == 1 else f"{techniques[0]} and {techniques[1]}"
-        learning_phrases = [
-            f"Working on {technique_work} takes patience - you're on the right track!",
-            f"Those {technique_work} adjustments we discussed will click with practice!",
-            f"Remember, mastering {technique_work} is a process - every rep counts!",
-            f"The {technique_work} work we covered today will pay off on court!"
-        ]
+        learning = random.choice(ENDING_TECHNIQUE_LEARNING_PHRASES).format(technique_work=technique_work)
     else:
-        learning_phrases = [
-            "The concepts we covered today will make more sense as you practice them!",
-            "Breaking down technique like this is how real improvement happens!",
-            "Those adjustments take time to feel natural - trust the process!",
-            "Every detail we discussed today builds toward better tennis!"
-        ]
+        learning = random.choice(ENDING_GENERAL_LEARNING_PHRASES)
     
-    # Motivational closings
-    motivation_phrases = [
-        "Keep that curiosity and drive - it's your biggest asset! 🎾",
-        "You've got the right mindset to take your game to the next level! 🎾",
-        "Stay patient with yourself and trust the process - you're improving! 🎾",
-        "That focus you showed today is what separates good players from great ones! 🎾",
-        "Keep asking great questions and putting in the work - exciting progress ahead! 🎾"
-    ]
-    
-    # Combine randomly
-    effort = random.choice(effort_phrases)
-    learning = random.choice(learning_phrases)
-    motivation = random.choice(motivation_phrases)
+    motivation = random.choice(ENDING_MOTIVATION_PHRASES)
     
     return f"{effort} {learning} {motivation}"
 
@@ -2346,59 +2649,81 @@ def generate_dynamic_session_ending(conversation_history: list, player_name: str
 
 # REPLACE all your existing admin functions with these updated versions
 
+@st.cache_data(ttl=30, show_spinner=False)
+def get_recent_session_messages():
+    """Recent Active_Sessions rows grouped into per-session message lists, newest first.
+    
+    The admin views read sessions and their conversations from this one pull,
+    so selecting a session does not need its own filterByFormula query.
+    Returns None if the fetch fails.
+    """
+    url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
+    params = {
+        "sort[0][field]": "timestamp",
+        "sort[0][direction]": "desc",
+        "maxRecords": 200,
+        "fields[]": ["session_id", "role", "message_content", "message_order", "coaching_resources_used",
+                     "resource_details", "timestamp", "session_status"]
+    }
+    
+    records = fetch_airtable_records(url, params)
+    if records is None:
+        return None
+    
+    messages_by_session = {}
+    for record in records:
+        fields = record.get('fields', {})
+        session_id = fields.get('session_id')
+        if session_id:
+            messages_by_session.setdefault(session_id, []).append({
+                'role': fields.get('role', ''),
+                'content': fields.get('message_content', ''),
+                'order': fields.get('message_order', 0),
+                'resources_used': fields.get('coaching_resources_used', 0),
+                'resource_details': fields.get('resource_details', ''),
+                'timestamp': fields.get('timestamp', ''),
+                'status': fields.get('session_status', 'unknown')
+            })
+    
+    return messages_by_session
+
+@st.cache_data(ttl=30, show_spinner=False)
 def get_all_coaching_sessions():
     """Fixed version - reads from Active_Sessions with actual resource data"""
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
-        params = {
-            "sort[0][field]": "timestamp",
-            "sort[0][direction]": "desc",
-            "maxRecords": 200
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code != 200:
+        messages_by_session = get_recent_session_messages()
+        if messages_by_session is None:
             return []
         
-        records = response.json().get('records', [])
-        
-        # Group by session_id and calculate resource analytics from Active_Sessions
-        sessions = {}
-        for record in records:
-            fields = record.get('fields', {})
-            session_id = fields.get('session_id')
+        # Calculate resource analytics per session from Active_Sessions
+        sessions_list = []
+        for session_id, messages in messages_by_session.items():
+            session = {
+                'session_id': session_id,
+                'message_count': len(messages),
+                'total_resources': 0,
+                'coach_responses': 0,
+                'timestamp': messages[0]['timestamp'],
+                'status': messages[0]['status']
+            }
             
-            if session_id:
-                if session_id not in sessions:
-                    sessions[session_id] = {
-                        'session_id': session_id,
-                        'message_count': 0,
-                        'total_resources': 0,
-                        'coach_responses': 0,
-                        'timestamp': fields.get('timestamp', ''),
-                        'status': fields.get('session_status', 'unknown')
-                    }
-                
-                sessions[session_id]['message_count'] += 1
-                
-                # Get resource data from Active_Sessions (this table DOES have the data)
-                if fields.get('role') == 'coach':
-                    sessions[session_id]['coach_responses'] += 1
+            # Get resource data from Active_Sessions (this table DOES have the data)
+            for msg in messages:
+                if msg['role'] == 'coach':
+                    session['coach_responses'] += 1
                     # Active_Sessions has coaching_resources_used field too!
-                    resources_used = fields.get('coaching_resources_used', 0)
-                    if resources_used:
-                        sessions[session_id]['total_resources'] += resources_used
-        
-        # Calculate resource efficiency
-        for session in sessions.values():
+                    if msg['resources_used']:
+                        session['total_resources'] += msg['resources_used']
+            
+            # Calculate resource efficiency
             if session['coach_responses'] > 0:
                 session['resources_per_response'] = round(session['total_resources'] / session['coach_responses'], 1)
             else:
                 session['resources_per_response'] = 0
+            
+            sessions_list.append(session)
         
-        sessions_list = list(sessions.values())
-        sessions_list.sort(key=lambda x: x['timestamp'], reverse=True)
+        sessions_list.sort(key=itemgetter('timestamp'), reverse=True)
         
         return sessions_list
         
@@ -2406,18 +2731,32 @@ def get_all_coaching_sessions():
         st.error(f"Error fetching sessions: {e}")
         return []
 
+def get_admin_sessions():
+    """Sessions list and session_id lookup, kept in session_state until the session data changes"""
+    sessions = get_all_coaching_sessions()
+    # Sessions are sorted newest first, so count + newest timestamp identifies this snapshot
+    version = (len(sessions), sessions[0]['timestamp'] if sessions else '')
+    
+    cached = st.session_state.get('admin_sessions_cache')
+    if cached is None or cached[0] != version:
+        cached = (version, sessions, {session['session_id']: session for session in sessions})
+        st.session_state.admin_sessions_cache = cached
+    
+    return cached[1], cached[2]
+
+@st.cache_data(ttl=30, show_spinner=False)
 def get_conversation_messages_with_resources(session_id):
     """Fixed version - reads from Active_Sessions with proper chat bubbles and resource details"""
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
         params = {
             "filterByFormula": f"{{session_id}} = {session_id}",
             "sort[0][field]": "message_order",
-            "sort[0][direction]": "asc"
+            "sort[0][direction]": "asc",
+            "fields[]": ["role", "message_content", "message_order", "coaching_resources_used", "resource_details"]
         }
         
-        response = requests.get(url, headers=headers, params=params)
+        response = get_airtable_session().get(url, params=params, timeout=5)
         if response.status_code == 200:
             records = response.json().get('records', [])
             messages = []
@@ -2429,8 +2768,7 @@ def get_conversation_messages_with_resources(session_id):
                     'content': fields.get('message_content', ''),
                     'order': fields.get('message_order', 0),
                     'resources_used': fields.get('coaching_resources_used', 0),
-                    'resource_details': fields.get('resource_details', ''),
-                    'log_id': fields.get('log_id', 0)
+                    'resource_details': fields.get('resource_details', '')
                 })
             
             return messages
@@ -2439,67 +2777,155 @@ def get_conversation_messages_with_resources(session_id):
         st.error(f"Error fetching conversation: {e}")
         return []
 
+def get_admin_session_messages(session_id):
+    """Conversation for one session, served from the recent-sessions pull when it holds the whole session"""
+    try:
+        messages = (get_recent_session_messages() or {}).get(session_id)
+    except Exception as e:
+        messages = None
+    
+    # The 200-row cutoff can split rows that share a timestamp, so only serve
+    # the pull when it holds every message order from 1 up to the newest
+    if messages:
+        orders = {msg['order'] for msg in messages}
+        if len(messages) == len(orders) and orders == set(range(1, max(orders) + 1)):
+            return sorted(messages, key=itemgetter('order'))
+    
+    return get_conversation_messages_with_resources(session_id)
+
+PLAYER_BUBBLE_HTML = (
+    '<div style="display: flex; justify-content: flex-start; margin: 10px 0;">'
+    '<div style="background-color: #E3F2FD; padding: 10px 15px; border-radius: 18px; max-width: 70%; border: 1px solid #BBDEFB;">'
+    '<strong>Player:</strong><br>{content}</div></div>'
+)
+COACH_BUBBLE_HTML = (
+    '<div style="display: flex; justify-content: flex-end; margin: 10px 0;">'
+    '<div style="background-color: #E8F5E8; padding: 10px 15px; border-radius: 18px; max-width: 70%; border: 1px solid #C8E6C9;">'
+    '<strong>Coach Taai:</strong>{resource_indicator}<br>{content}</div></div>'
+)
+
+# Messages shown per page in the admin conversation views
+CONVERSATION_PAGE_SIZE = 50
+
+def display_conversation_log(messages, key: str):
+    """Render one page of chat bubbles, batching the HTML into as few st.markdown calls as possible.
+    
+    Starts at the newest page; key keeps each view's position separate in session_state.
+    """
+    total = len(messages)
+    offset_key = f"conversation_offset_{key}"
+    newest_offset = max(0, total - CONVERSATION_PAGE_SIZE)
+    offset = min(st.session_state.get(offset_key, newest_offset), newest_offset)
+    
+    if total > CONVERSATION_PAGE_SIZE:
+        col1, col2 = st.columns(2)
+        with col1:
+            if offset > 0 and st.button(f"⬆️ Load older ({offset} earlier)", key=f"older_{key}"):
+                st.session_state[offset_key] = max(0, offset - CONVERSATION_PAGE_SIZE)
+                st.rerun()
+        with col2:
+            if offset < newest_offset and st.button("⬇️ Show newer", key=f"newer_{key}"):
+                st.session_state[offset_key] = min(newest_offset, offset + CONVERSATION_PAGE_SIZE)
+                st.rerun()
+        st.caption(f"Messages {offset + 1}-{min(total, offset + CONVERSATION_PAGE_SIZE)} of {total}")
+    
+    parts = []
+    for msg in messages[offset:offset + CONVERSATION_PAGE_SIZE]:
+        role = msg['role']
+        # Message text is user input rendered with unsafe_allow_html - escape it
+        content = html.escape(msg['content'])
+        resources_used = msg.get('resources_used', 0)
+        
+        if role == 'player':
+            parts.append(PLAYER_BUBBLE_HTML.format(content=content))
+        elif role == 'coach':
+            resource_indicator = f" 📚 {resources_used}" if resources_used > 0 else ""
+            parts.append(COACH_BUBBLE_HTML.format(resource_indicator=resource_indicator, content=content))
+            
+            # Resource details live in an expander, so flush the bubbles so far to keep ordering
+            if resources_used > 0 and msg.get('resource_details'):
+                st.markdown("".join(parts), unsafe_allow_html=True)
+                parts = []
+                with st.expander(f"📊 View {resources_used} coaching resources"):
+                    st.text(msg['resource_details'])
+    
+    if parts:
+        st.markdown("".join(parts), unsafe_allow_html=True)
+
+RESOURCE_BREAKDOWN_COLUMNS = ['Response #', 'Resources', 'Response Preview']
+SESSION_HISTORY_COLUMNS = ['Session #', 'Session ID', 'Messages', 'Resources', 'Duration (min)', 'Status']
+
 def display_resource_analytics(messages):
     """Display resource usage analytics for a session"""
-    # Calculate analytics
+    # Calculate analytics in a single pass over the session
     total_messages = len(messages)
-    coach_messages = [m for m in messages if m['role'] == 'coach']
-    player_messages = [m for m in messages if m['role'] == 'player']
-    
-    total_resources = sum(m.get('resources_used', 0) for m in coach_messages)
-    responses_with_resources = len([m for m in coach_messages if m.get('resources_used', 0) > 0])
+    coach_count = 0
+    player_count = 0
+    total_resources = 0
+    responses_with_resources = 0
+    resource_responses = []
+    resource_messages = []  # (response number, message) pairs that used resources
+    
+    for msg in messages:
+        role = msg['role']
+        if role == 'coach':
+            coach_count += 1
+            resources_used = msg.get('resources_used', 0)
+            total_resources += resources_used
+            if resources_used > 0:
+                responses_with_resources += 1
+                resource_messages.append((coach_count, msg))
+                resource_responses.append({
+                    'Response #': coach_count,
+                    'Resources': resources_used,
+                    'Response Preview': truncate_text(msg['content'], 80)
+                })
+        elif role == 'player':
+            player_count += 1
     
     # Display metrics
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.metric("Total Messages", total_messages)
     with col2:
-        st.metric("Coach Responses", len(coach_messages))
+        st.metric("Coach Responses", coach_count)
     with col3:
         st.metric("Resources Used", total_resources)
     with col4:
-        resource_rate = f"{(responses_with_resources/len(coach_messages)*100):.0f}%" if coach_messages else "0%"
+        resource_rate = f"{(responses_with_resources/coach_count*100):.0f}%" if coach_count else "0%"
         st.metric("Resource Usage Rate", resource_rate)
     
     # Resource breakdown
     if total_resources > 0:
         st.markdown("#### 📚 Resource Usage Breakdown")
         
-        resource_responses = []
-        for i, msg in enumerate(coach_messages):
-            if msg.get('resources_used', 0) > 0:
-                resource_responses.append({
-                    'Response #': i + 1,
-                    'Resources': msg['resources_used'],
-                    'Response Preview': msg['content'][:80] + "..." if len(msg['content']) > 80 else msg['content']
-                })
-        
         if resource_responses:
-            df = pd.DataFrame(resource_responses)
+            df = pd.DataFrame.from_records(resource_responses, columns=RESOURCE_BREAKDOWN_COLUMNS)
             st.dataframe(df, use_container_width=True)
             
             # Show detailed resource information
             st.markdown("#### 🔍 Detailed Resource Analysis")
-            for i, msg in enumerate(coach_messages):
-                if msg.get('resources_used', 0) > 0 and msg.get('resource_details'):
-                    with st.expander(f"Response #{i+1}: {msg['resources_used']} resources used"):
+            for response_number, msg in resource_messages:
+                if msg.get('resource_details'):
+                    with st.expander(f"Response #{response_number}: {msg['resources_used']} resources used"):
                         st.markdown("**Coach Response:**")
                         st.write(msg['content'])
                         st.markdown("**Resources Used:**")
                         st.text(msg['resource_details'])
 
+@st.cache_data(ttl=60, show_spinner=False)
 def get_all_players():
     """Fetch all players with their session counts and engagement metrics"""
     try:
-        url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Players"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        url = f"{AIRTABLE_BASE_URL}/Players"
         params = {
             "sort[0][field]": "total_sessions",
             "sort[0][direction]": "desc",
-            "maxRecords": 100
+            "maxRecords": 100,
+            "fields[]": ["name", "email", "tennis_level", "total_sessions", "first_session_date", "player_status"]
         }
         
-        response = requests.get(url, headers=headers, params=params)
+        response = get_airtable_session().get(url, params=params, timeout=5)
         if response.status_code != 200:
             return []
         
@@ -2528,29 +2954,43 @@ def get_all_players():
 def get_player_sessions_from_conversation_log(player_id: str):
     """Get all sessions for a specific player from Conversation_Log with detailed metrics - FIXED VERSION"""
     try:
-        # First get player info
-        player_url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Players/{player_id}"
-        headers = {"Authorization": f"Bearer {st.secrets['AIRTABLE_API_KEY']}"}
+        player_url = f"{AIRTABLE_BASE_URL}/Players/{player_id}"
+        active_sessions_url = f"{AIRTABLE_BASE_URL}/Active_Sessions"
+        # Only pull the fields used below - message text and resource details
+        # make up most of each record's payload
+        active_params = {
+            "sort[0][field]": "timestamp",
+            "sort[0][direction]": "desc", 
+            "maxRecords": 500,
+            "fields[]": ["player_id", "session_id"]
+        }
+        conv_log_url = f"{AIRTABLE_BASE_URL}/Conversation_Log"
+        conv_params = {
+            "sort[0][field]": "log_id",
+            "sort[0][direction]": "desc",
+            "maxRecords": 1000,
+            "fields[]": ["session_id", "role", "coaching_resources_used", "log_id"]
+        }
         
-        player_response = requests.get(player_url, headers=headers)
+        # The three reads are independent - fetch them concurrently
+        session = get_airtable_session()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            player_future = executor.submit(session.get, player_url, timeout=5)
+            active_future = executor.submit(fetch_airtable_records, active_sessions_url, active_params)
+            conv_future = executor.submit(fetch_airtable_records, conv_log_url, conv_params)
+            player_response = player_future.result()
+            active_records = active_future.result()
+            conv_records = conv_future.result()
+        
+        # Player info
         if player_response.status_code != 200:
             return [], {}
         
         player_info = player_response.json().get('fields', {})
         
-        # STEP 1: Get all Active_Sessions for this player to find their session_ids
-        active_sessions_url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Active_Sessions"
-        active_params = {
-            "sort[0][field]": "timestamp",
-            "sort[0][direction]": "desc", 
-            "maxRecords": 500
-        }
-        
-        active_response = requests.get(active_sessions_url, headers=headers, params=active_params)
-        if active_response.status_code != 200:
+        # STEP 1: Find this player's session_ids in Active_Sessions
+        if active_records is None:
             return [], player_info
-            
-        active_records = active_response.json().get('records', [])
         
         # Find session_ids for this player
         player_session_ids = set()
@@ -2569,21 +3009,12 @@ def get_player_sessions_from_conversation_log(player_id: str):
         if not player_session_ids:
             return [], player_info  # No sessions found for this player
         
-        # STEP 2: Get all Conversation_Log records
-        conv_log_url = f"https://api.airtable.com/v0/appTCnWCPKMYPUXK0/Conversation_Log"
-        conv_params = {
-            "sort[0][field]": "log_id",
-            "sort[0][direction]": "desc",
-            "maxRecords": 1000
-        }
-        
-        conv_response = requests.get(conv_log_url, headers=headers, params=conv_params)
-        if conv_response.status_code != 200:
+        # STEP 2: Conversation_Log records
+        if conv_records is None:
             return [], player_info
         
-        conv_records = conv_response.json().get('records', [])
-        
         # STEP 3: Filter Conversation_Log records for this player's sessions
+        record_id_to_session_id = {rid: sid for sid, rid in session_id_to_record_id.items()}
         session_metrics = {}
         
         for record in conv_records:
@@ -2594,11 +3025,7 @@ def get_player_sessions_from_conversation_log(player_id: str):
             for session_link in record_session_links:
                 # session_link is the Active_Sessions record_id
                 # Find the corresponding session_id number
-                matching_session_id = None
-                for sid, rid in session_id_to_record_id.items():
-                    if rid == session_link:
-                        matching_session_id = sid
-                        break
+                matching_session_id = record_id_to_session_id.get(session_link)
                 
                 if matching_session_id and matching_session_id in player_session_ids:
                     if matching_session_id not in session_metrics:
@@ -2645,7 +3072,7 @@ def get_player_sessions_from_conversation_log(player_id: str):
             session['first_message_time'] = str(session['first_log_id'])
         
         sessions_list = list(session_metrics.values())
-        sessions_list.sort(key=lambda x: x['first_log_id'], reverse=True)
+        sessions_list.sort(key=itemgetter('first_log_id'), reverse=True)
         
         return sessions_list, player_info
         
@@ -2659,13 +3086,24 @@ def display_player_engagement_analytics(sessions, player_info):
         st.warning("No sessions found for this player.")
         return
     
-    # Player overview metrics
+    # Player overview metrics - totals gathered in one pass over the sessions
     total_sessions = len(sessions)
-    total_messages = sum(s['message_count'] for s in sessions)
-    total_resources = sum(s['total_resources'] for s in sessions)
-    total_duration = sum(s['duration_minutes'] for s in sessions)
+    total_messages = 0
+    total_resources = 0
+    total_duration = 0
+    total_coach_responses = 0
+    completed_sessions = 0
+    resource_sessions = 0
+    for s in sessions:
+        total_messages += s['message_count']
+        total_resources += s['total_resources']
+        total_duration += s['duration_minutes']
+        total_coach_responses += s['coach_responses']
+        if s['status'] == 'completed':
+            completed_sessions += 1
+        if s['total_resources'] > 0:
+            resource_sessions += 1
     
-    completed_sessions = len([s for s in sessions if s['status'] == 'completed'])
     avg_messages_per_session = total_messages / total_sessions if total_sessions > 0 else 0
     avg_duration = total_duration / total_sessions if total_sessions > 0 else 0
     
@@ -2685,10 +3123,9 @@ def display_player_engagement_analytics(sessions, player_info):
     with col1:
         st.metric("Total Resources Used", total_resources)
     with col2:
-        avg_resources = total_resources / sum(s['coach_responses'] for s in sessions) if sum(s['coach_responses'] for s in sessions) > 0 else 0
+        avg_resources = total_resources / total_coach_responses if total_coach_responses > 0 else 0
         st.metric("Avg Resources/Response", f"{avg_resources:.1f}")
     with col3:
-        resource_sessions = len([s for s in sessions if s['total_resources'] > 0])
         resource_rate = (resource_sessions / total_sessions * 100) if total_sessions > 0 else 0
         st.metric("Sessions Using Resources", f"{resource_rate:.0f}%")
     
@@ -2701,12 +3138,13 @@ def display_player_engagement_analytics(sessions, player_info):
             'Session ID': session['session_id'],
             'Messages': session['message_count'],
             'Resources': session['total_resources'],
-            'Duration (min)': f"{session['duration_minutes']:.1f}",
+            'Duration (min)': float(session['duration_minutes']),
             'Status': session['status'].title()
         })
     
-    df = pd.DataFrame(session_data)
-    st.dataframe(df, use_container_width=True)
+    # Keep duration numeric (sortable) and only format it for display
+    df = pd.DataFrame.from_records(session_data, columns=SESSION_HISTORY_COLUMNS)
+    st.dataframe(df.style.format({'Duration (min)': '{:.1f}'}), use_container_width=True)
     
     # Engagement trends
     if len(sessions) > 1:
@@ -2729,11 +3167,56 @@ def display_player_engagement_analytics(sessions, player_info):
             with col2:
                 st.write(f"{trend_emoji} **Engagement Trend:** {'Increasing' if message_trend > 0 else 'Decreasing' if message_trend < 0 else 'Stable'}")
 
+@st.cache_data(ttl=60, show_spinner=False)
+def build_player_options(players: tuple) -> dict:
+    """Selectbox labels for the player picker, from (player_id, name, email, level, total_sessions) tuples"""
+    player_options = {}
+    for player_id, name, email, level, sessions_count in players:
+        if name == 'Unknown':
+            name = email.split('@')[0]
+        display_name = f"{name} ({level}) - {sessions_count} sessions"
+        player_options[display_name] = player_id
+    return player_options
+
+@st.cache_data(ttl=60, show_spinner=False)
+def build_player_session_options(sessions: tuple) -> dict:
+    """Selectbox labels for a player's sessions, from (session_id, status, resources, messages) tuples, newest first"""
+    session_options = {}
+    # Sessions arrive newest first, so number them counting down
+    numbers = range(len(sessions), 0, -1)
+    for number, (session_id, status, total_resources, message_count) in zip(numbers, sessions):
+        status_emoji = "✅" if status == 'completed' else "🟡"
+        resource_info = f"📚{total_resources}"
+        display_name = f"{status_emoji} Session #{number} | {session_id} | {message_count} msgs | {resource_info}"
+        session_options[display_name] = session_id
+    return session_options
+
+# Most options an admin selectbox renders at once - the filter box narrows the rest
+SELECTBOX_OPTION_CAP = 50
+
+def filter_select_options(options, key: str) -> list:
+    """Text filter in front of an admin selectbox, returning at most SELECTBOX_OPTION_CAP matches"""
+    query = st.text_input("🔎 Filter", key=key).strip().lower()
+    if query:
+        matches = [option for option in options if query in option.lower()]
+    else:
+        matches = list(options)
+    return matches[:SELECTBOX_OPTION_CAP]
+
 def display_admin_interface(index, claude_client):
     """Enhanced admin interface reading from Active_Sessions for resource analytics"""
     st.title("🔧 Tennis Coach AI - Admin Interface")
     st.markdown("### Session Management & Player Analytics")
     
+    # Airtable reads are cached for a short TTL - allow a manual refresh
+    if st.button("🔄 Refresh Data", key="admin_refresh_data"):
+        get_recent_session_messages.clear()
+        get_all_coaching_sessions.clear()
+        get_conversation_messages_with_resources.clear()
+        get_all_players.clear()
+        st.session_state.pop('admin_sessions_cache', None)
+        st.rerun()
+    
     # ADMIN COACHING MODE CONTROL
     st.markdown("---")
     col1, col2 = st.columns(2)
@@ -2779,7 +3262,7 @@ def display_admin_interface(index, claude_client):
     
     with tab1:
         # Session overview from Active_Sessions
-        sessions = get_all_coaching_sessions()
+        sessions, sessions_by_id = get_admin_sessions()
         
         if not sessions:
             st.warning("No coaching sessions found.")
@@ -2801,12 +3284,12 @@ def display_admin_interface(index, claude_client):
             
             st.markdown("---")
             
-            # Session selector
+            # Session selector - the filter box reaches older sessions, the list shows the newest matches
             session_options = {}
-            for session in sessions[:15]:
+            for session in sessions:
                 timestamp = session['timestamp']
                 try:
-                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                    dt = parse_airtable_timestamp(timestamp)
                     formatted_time = dt.strftime("%m/%d %H:%M")
                 except:
                     formatted_time = "Unknown time"
@@ -2818,13 +3301,13 @@ def display_admin_interface(index, claude_client):
             
             selected_display = st.selectbox(
                 "🎾 Select Session to Analyze",
-                options=list(session_options.keys()),
+                options=filter_select_options(session_options, key="admin_session_filter"),
                 help="Choose a session to view conversation and resource analytics"
             )
             
             if selected_display:
                 selected_session_id = session_options[selected_display]
-                session_info = next(s for s in sessions if s['session_id'] == selected_session_id)
+                session_info = sessions_by_id[selected_session_id]
                 
                 # Display session metrics
                 col1, col2, col3, col4 = st.columns(4)
@@ -2840,7 +3323,7 @@ def display_admin_interface(index, claude_client):
                 st.markdown("---")
                 
                 # Get conversation with resource details - FIXED VERSION
-                messages = get_conversation_messages_with_resources(selected_session_id)
+                messages = get_admin_session_messages(selected_session_id)
                 
                 if messages:
                     # Create tabs for different views
@@ -2848,39 +3331,7 @@ def display_admin_interface(index, claude_client):
                     
                     with conv_tab1:
                         st.markdown("### 💬 Conversation Log")
-                        
-                        for msg in messages:
-                            role = msg['role']
-                            content = msg['content']
-                            resources_used = msg.get('resources_used', 0)
-                            
-                            if role == 'player':
-                                # Player message - left side, blue bubble
-                                st.markdown(f"""
-                                <div style="display: flex; justify-content: flex-start; margin: 10px 0;">
-                                    <div style="background-color: #E3F2FD; padding: 10px 15px; border-radius: 18px; max-width: 70%; border: 1px solid #BBDEFB;">
-                                        <strong> Player:</strong><br>
-                                        {content}
-                                    </div>
-                                </div>
-                                """, unsafe_allow_html=True)
-                                
-                            elif role == 'coach':
-                                # Coach message - right side, green bubble
-                                resource_indicator = f" 📚 {resources_used}" if resources_used > 0 else ""
-                                st.markdown(f"""
-                                <div style="display: flex; justify-content: flex-end; margin: 10px 0;">
-                                    <div style="background-color: #E8F5E8; padding: 10px 15px; border-radius: 18px; max-width: 70%; border: 1px solid #C8E6C9;">
-                                        <strong>Coach Taai:</strong>{resource_indicator}<br>
-                                        {content}
-                                    </div>
-                                </div>
-                                """, unsafe_allow_html=True)
-                                
-                                # Show expandable resource details if available
-                                if resources_used > 0 and msg.get('resource_details'):
-                                    with st.expander(f"📊 View {resources_used} coaching resources"):
-                                        st.text(msg['resource_details'])
+                        display_conversation_log(messages, key=f"session_{selected_session_id}")
                     
                     with conv_tab2:
                         # Resource analytics tab
@@ -2898,18 +3349,15 @@ def display_admin_interface(index, claude_client):
         if not players:
             st.warning("No players found in the database.")
         else:
-            # Player selector
-            player_options = {}
-            for player in players:
-                name = player['name'] if player['name'] != 'Unknown' else player['email'].split('@')[0]
-                level = player['tennis_level']
-                sessions_count = player['total_sessions']
-                display_name = f"{name} ({level}) - {sessions_count} sessions"
-                player_options[display_name] = player['player_id']
+            # Player selector - players arrive sorted by total_sessions, so the cap keeps the most active
+            player_options = build_player_options(tuple(
+                (p['player_id'], p['name'], p['email'], p['tennis_level'], p['total_sessions'])
+                for p in players
+            ))
             
             selected_player_display = st.selectbox(
                 "🧑‍🎓 Select Player to Analyze",
-                options=list(player_options.keys()),
+                options=filter_select_options(player_options, key="admin_player_filter"),
                 help="Choose a player to view their complete engagement history"
             )
             
@@ -2930,10 +3378,7 @@ def display_admin_interface(index, claude_client):
                         st.write(f"**Tennis Level:** {player_info.get('tennis_level', 'Not specified')}")
                         st.write(f"**Status:** {player_info.get('player_status', 'Unknown')}")
                     with col3:
-                        try:
-                            first_session = datetime.fromisoformat(player_info.get('first_session_date', '').replace('Z', '+00:00')).strftime("%m/%d/%Y")
-                        except:
-                            first_session = "Unknown"
+                        first_session = format_airtable_date(player_info.get('first_session_date'))
                         st.write(f"**First Session:** {first_session}")
                         st.write(f"**Total Sessions:** {player_info.get('total_sessions', 0)}")
                     
@@ -2946,54 +3391,25 @@ def display_admin_interface(index, claude_client):
                     
                     # Individual session selector for this player
                     st.markdown("#### 🔍 View Individual Sessions")
-                    session_options = {}
-                    for i, session in enumerate(player_sessions):
-                        status_emoji = "✅" if session['status'] == 'completed' else "🟡"
-                        resource_info = f"📚{session['total_resources']}"
-                        display_name = f"{status_emoji} Session #{len(player_sessions)-i} | {session['session_id']} | {session['message_count']} msgs | {resource_info}"
-                        session_options[display_name] = session['session_id']
+                    session_options = build_player_session_options(tuple(
+                        (s['session_id'], s['status'], s['total_resources'], s['message_count'])
+                        for s in player_sessions
+                    ))
                     
                     if session_options:
                         selected_session_display = st.selectbox(
                             "Select a session to view details:",
-                            options=list(session_options.keys()),
+                            options=filter_select_options(session_options, key="player_session_filter"),
                             key="player_session_selector"
                         )
                         
                         if selected_session_display:
                             selected_session_id = session_options[selected_session_display]
-                            messages = get_conversation_messages_with_resources(selected_session_id)
+                            messages = get_admin_session_messages(selected_session_id)
                             
                             if messages:
                                 st.markdown("##### 💬 Session Conversation")
-                                for msg in messages:
-                                    role = msg['role']
-                                    content = msg['content']
-                                    resources_used = msg.get('resources_used', 0)
-                                    
-                                    if role == 'player':
-                                        st.markdown(f"""
-                                        <div style="display: flex; justify-content: flex-start; margin: 10px 0;">
-                                            <div style="background-color: #E3F2FD; padding: 10px 15px; border-radius: 18px; max-width: 70%; border: 1px solid #BBDEFB;">
-                                                <strong>Player:</strong><br>
-                                                {content}
-                                            </div>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                                    elif role == 'coach':
-                                        resource_indicator = f" 📚 {resources_used}" if resources_used > 0 else ""
-                                        st.markdown(f"""
-                                        <div style="display: flex; justify-content: flex-end; margin: 10px 0;">
-                                            <div style="background-color: #E8F5E8; padding: 10px 15px; border-radius: 18px; max-width: 70%; border: 1px solid #C8E6C9;">
-                                                <strong>Coach Taai:</strong>{resource_indicator}<br>
-                                                {content}
-                                            </div>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                                        
-                                        if resources_used > 0 and msg.get('resource_details'):
-                                            with st.expander(f"📊 View {resources_used} coaching resources"):
-                                                st.text(msg['resource_details'])
+                                display_conversation_log(messages, key=f"player_session_{selected_session_id}")
                 else:
                     st.warning("No sessions found for this player.")
     
@@ -3047,13 +3463,13 @@ def display_admin_interface(index, claude_client):
             st.markdown("Analyze fallback patterns for specific sessions")
             
             # Session selector for detailed analysis
-            sessions = get_all_coaching_sessions()
+            sessions, _ = get_admin_sessions()
             if sessions:
                 session_options = {}
                 for session in sessions[:20]:  # Show last 20 sessions
                     timestamp = session['timestamp']
                     try:
-                        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                        dt = parse_airtable_timestamp(timestamp)
                         formatted_time = dt.strftime("%m/%d %H:%M")
                     except:
                         formatted_time = "Unknown time"
@@ -3216,8 +3632,13 @@ def main():
     st.markdown("*Your personal tennis coaching assistant*")
     st.markdown("---")
     
-    with st.spinner("Connecting to tennis coaching database..."):
+    # Clients are cached for the app's lifetime, so only the session's first run needs a spinner
+    if st.session_state.get('connections_ready'):
         index, claude_client = setup_connections()
+    else:
+        with st.spinner("Connecting to tennis coaching database..."):
+            index, claude_client = setup_connections()
+        st.session_state.connections_ready = bool(index and claude_client)
     
     if not index or not claude_client:
         st.error("Failed to connect to coaching systems. Please check API keys.")
@@ -3240,7 +3661,7 @@ def main():
             st.session_state.conversation_log = []
             st.session_state.player_setup_complete = False
             st.session_state.welcome_followup = None
-            st.session_state.recent_greetings = []
+            st.session_state.recent_greetings = deque(maxlen=RECENT_GREETINGS_KEPT)
             st.rerun()    
     
     # PLAYER SETUP FORM
@@ -3284,40 +3705,11 @@ def main():
                         
                         # Log both messages
                         if st.session_state.get("player_record_id"):
-                            # Log greeting message
-                            st.session_state.message_counter += 1
-                            log_message_to_sss(
-                                st.session_state.player_record_id,
-                                session_id,
-                                st.session_state.message_counter,
-                                "assistant",
-                                welcome_msg
-                            )
-                            log_message_to_conversation_log(
-                                st.session_state.player_record_id,
-                                session_id,
-                                st.session_state.message_counter,
-                                "assistant",
-                                welcome_msg
-                            )
-                            
-                            # Log followup message if exists
-                            if followup_msg:
+                            welcome_log = []
+                            for msg in st.session_state.messages:
                                 st.session_state.message_counter += 1
-                                log_message_to_sss(
-                                    st.session_state.player_record_id,
-                                    session_id,
-                                    st.session_state.message_counter,
-                                    "assistant",
-                                    followup_msg
-                                )
-                                log_message_to_conversation_log(
-                                    st.session_state.player_record_id,
-                                    session_id,
-                                    st.session_state.message_counter,
-                                    "assistant",
-                                    followup_msg
-                                )
+                                welcome_log.append((st.session_state.message_counter, msg["content"]))
+                            log_welcome_messages(st.session_state.player_record_id, session_id, welcome_log)
                         
                         st.success("Welcome! Ready to start your coaching session.")
                         st.rerun()
@@ -3330,14 +3722,22 @@ def main():
     
     # USER INPUT HANDLING
     if prompt := st.chat_input("Ask your tennis coach..."):
+        # Snapshot the ids used throughout this turn
+        player_record_id = st.session_state.get("player_record_id")
+        session_id = st.session_state.get("session_id")
+        
+        # Short replies are the only ones that can be commands, so only those get lowercased
+        stripped_prompt = prompt.strip()
+        short_reply = stripped_prompt.lower() if len(stripped_prompt) <= SHORT_REPLY_MAX_LEN else None
+        
         # ADMIN MODE TRIGGER
-        if prompt.strip().lower() == "hilly spike":
+        if short_reply == ADMIN_TRIGGER_PHRASE:
             st.session_state.admin_mode = True
             st.rerun()
             return
         
         # Smart session end detection
-        end_result = detect_session_end(prompt, st.session_state.messages)
+        end_result = detect_session_end(prompt, claude_client, st.session_state.messages)
         
         if end_result['should_end']:
             if end_result['needs_confirmation']:
@@ -3345,69 +3745,35 @@ def main():
                 st.session_state.pending_session_end = True
                 st.session_state.end_confidence = end_result['confidence']
             else:
-                # High confidence - end immediately
+                # High confidence - end immediately, nothing is left to confirm
                 st.session_state.session_ending = True
+                st.session_state.pending_session_end = False
         
         # Handle confirmation responses
-        if st.session_state.get("pending_session_end") and prompt.lower().strip() in ["yes", "y", "yeah", "yep", "sure"]:
-            st.session_state.session_ending = True
-            st.session_state.pending_session_end = False
-        elif st.session_state.get("pending_session_end") and prompt.lower().strip() in ["no", "n", "nope", "not yet", "continue"]:
-            st.session_state.pending_session_end = False
-        
-        st.session_state.message_counter += 1
+        if short_reply and st.session_state.get("pending_session_end"):
+            if short_reply in SESSION_END_CONFIRM_REPLIES:
+                st.session_state.session_ending = True
+                st.session_state.pending_session_end = False
+            elif short_reply in SESSION_END_DECLINE_REPLIES:
+                st.session_state.pending_session_end = False
         
         # DUAL LOGGING: Log user message to both tables
-        if st.session_state.get("player_record_id"):
-            log_message_to_sss(
-                st.session_state.player_record_id,
-                st.session_state.session_id,
-                st.session_state.message_counter,
-                "user",
-                prompt
-            )
-            log_message_to_conversation_log(
-                st.session_state.player_record_id,
-                st.session_state.session_id,
-                st.session_state.message_counter,
-                "user",
-                prompt
-            )
+        record_chat_message(player_record_id, session_id, "user", prompt)
         
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        session_ending = st.session_state.get("session_ending", False)
         
         # NEW: Handle introduction sequence for new players
-        if not st.session_state.get("intro_completed", True):  # True for returning players
+        if not session_ending and not st.session_state.get("intro_completed", True):  # True for returning players
             intro_response = handle_introduction_sequence(prompt, claude_client)
             if intro_response:
                 with st.chat_message("assistant"):
                     st.markdown(intro_response)
                 
-                st.session_state.message_counter += 1
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": intro_response
-                })
-                
                 # DUAL LOGGING: Log intro response to both tables
-                if st.session_state.get("player_record_id"):
-                    log_message_to_sss(
-                        st.session_state.player_record_id,
-                        st.session_state.session_id,
-                        st.session_state.message_counter,
-                        "assistant",
-                        intro_response
-                    )
-                    log_message_to_conversation_log(
-                        st.session_state.player_record_id,
-                        st.session_state.session_id,
-                        st.session_state.message_counter,
-                        "assistant",
-                        intro_response
-                    )
+                record_chat_message(player_record_id, session_id, "assistant", intro_response)
                 return  # Don't process as normal coaching message yet
         
         # Handle session end confirmation
@@ -3418,67 +3784,28 @@ def main():
             with st.chat_message("assistant"):
                 st.markdown(confirmation_msg)
             
-            st.session_state.message_counter += 1
-            st.session_state.messages.append({
-                "role": "assistant", 
-                "content": confirmation_msg
-            })
-            
             # DUAL LOGGING: Log confirmation message to both tables
-            if st.session_state.get("player_record_id"):
-                log_message_to_sss(
-                    st.session_state.player_record_id,
-                    st.session_state.session_id,
-                    st.session_state.message_counter,
-                    "assistant",
-                    confirmation_msg
-                )
-                log_message_to_conversation_log(
-                    st.session_state.player_record_id,
-                    st.session_state.session_id,
-                    st.session_state.message_counter,
-                    "assistant",
-                    confirmation_msg
-                )
+            record_chat_message(player_record_id, session_id, "assistant", confirmation_msg)
             return
         
         # If session is ending, provide closing response and mark as completed
-        if st.session_state.get("session_ending"):
+        if session_ending:
             with st.chat_message("assistant"):
                 # Get player name for personalized ending message
-                player_name, _ = get_current_player_info(st.session_state.get("player_record_id", ""))
+                player_name, _ = get_current_player_info(player_record_id or "")
                 closing_response = generate_dynamic_session_ending(st.session_state.messages, player_name)
                 st.markdown(closing_response)
                 
-                # Log closing response
-                st.session_state.message_counter += 1
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": closing_response
-                })
-                
                 # DUAL LOGGING: Log closing response to both tables
-                if st.session_state.get("player_record_id"):
-                    log_message_to_sss(
-                        st.session_state.player_record_id,
-                        st.session_state.session_id,
-                        st.session_state.message_counter,
-                        "assistant",
-                        closing_response
-                    )
-                    log_message_to_conversation_log(
-                        st.session_state.player_record_id,
-                        st.session_state.session_id,
-                        st.session_state.message_counter,
-                        "assistant",
-                        closing_response
-                    )
+                record_chat_message(player_record_id, session_id, "assistant", closing_response)
                 
                 # Mark session as completed
-                if st.session_state.get("player_record_id"):
+                if player_record_id:
+                    # The closing messages must be in Active_Sessions before they are marked and summarized
+                    wait_for_pending_logs()
                     session_marked = mark_session_completed(
-                        st.session_state.player_record_id,
-                        st.session_state.session_id
+                        player_record_id,
+                        session_id
                     )
                     if session_marked:
                         st.success("✅ Session marked as completed!")
@@ -3486,8 +3813,8 @@ def main():
                         # Generate session summary
                         with st.spinner("🧠 Generating session summary..."):
                             summary_created = process_completed_session(
-                                st.session_state.player_record_id,
-                                st.session_state.session_id,
+                                player_record_id,
+                                session_id,
                                 claude_client
                             )
                             if summary_created:
@@ -3506,37 +3833,15 @@ def main():
         # SMART COACHING MODE WITH THREE OPTIONS
         with st.chat_message("assistant"):
             with st.spinner("Coach is thinking..."):
-                response, chunks = get_smart_coaching_response(
-                    prompt, index, claude_client, coaching_mode, top_k
+                coaching_prompt, chunks = get_smart_coaching_prompt(
+                    prompt, index, coaching_mode, top_k
                 )
-                
-                st.markdown(response)
-                
-                st.session_state.message_counter += 1
-                
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": response
-                })
-                
-                # DUAL LOGGING: Log coach response with chunks info
-                if st.session_state.get("player_record_id"):
-                    log_message_to_sss(
-                        st.session_state.player_record_id,
-                        st.session_state.session_id,
-                        st.session_state.message_counter,
-                        "assistant",
-                        response,
-                        chunks
-                    )
-                    log_message_to_conversation_log(
-                        st.session_state.player_record_id,
-                        st.session_state.session_id,
-                        st.session_state.message_counter,
-                        "assistant",
-                        response,
-                        chunks
-                    )
+            
+            # Render the reply as it is generated, then log the full text
+            response = st.write_stream(stream_claude(claude_client, coaching_prompt))
+            
+            # DUAL LOGGING: Log coach response with chunks info
+            record_chat_message(player_record_id, session_id, "assistant", response, chunks)
 
 if __name__ == "__main__":
     main()
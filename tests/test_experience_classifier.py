@@ -0,0 +1,60 @@
+import pytest
+
+# The app module imports its service clients at load time
+for _module in ("streamlit", "pandas", "numpy", "pinecone", "openai", "anthropic", "requests"):
+    pytest.importorskip(_module)
+
+from tennis_coach_webapp import classify_experience_locally
+
+NEW_TO_TENNIS = "are you pretty new to tennis?"
+TENNIS_JOURNEY = "tell me about your tennis journey"
+
+
+@pytest.mark.parametrize("reply", [
+    "less than a year",
+    "Under a year so far",
+    "about half a year",
+    "not even a year yet",
+])
+def test_under_a_year_is_beginner(reply):
+    assert classify_experience_locally(reply, TENNIS_JOURNEY) == "BEGINNER"
+
+
+@pytest.mark.parametrize("reply", ["a couple of months", "couple months", "just a few months"])
+def test_months_are_beginner(reply):
+    assert classify_experience_locally(reply, TENNIS_JOURNEY) == "BEGINNER"
+
+
+def test_yes_to_new_to_tennis_is_beginner():
+    assert classify_experience_locally("Yes!", NEW_TO_TENNIS) == "BEGINNER"
+
+
+def test_yes_to_other_questions_is_left_to_claude():
+    assert classify_experience_locally("Yes!", TENNIS_JOURNEY) is None
+
+
+@pytest.mark.parametrize("reply, level", [
+    ("I've been playing for 2 years", "INTERMEDIATE"),
+    ("about a year", "INTERMEDIATE"),
+    ("15 years, mostly tournaments", "ADVANCED"),
+])
+def test_year_counts(reply, level):
+    assert classify_experience_locally(reply, TENNIS_JOURNEY) == level
+
+
+def test_league_is_intermediate():
+    assert classify_experience_locally("I play in a league", TENNIS_JOURNEY) == "INTERMEDIATE"
+
+
+@pytest.mark.parametrize("reply", ["I'm not a beginner", "no, I've played in tournaments"])
+def test_negated_replies_are_left_to_claude(reply):
+    assert classify_experience_locally(reply, NEW_TO_TENNIS) is None
+
+
+@pytest.mark.parametrize("reply", ["kind of", "I've played for 5 years"])
+def test_unclear_replies_are_left_to_claude(reply):
+    assert classify_experience_locally(reply, NEW_TO_TENNIS) is None
+
+
+def test_conflicting_cues_are_left_to_claude():
+    assert classify_experience_locally("just started but I play in a league", TENNIS_JOURNEY) is None
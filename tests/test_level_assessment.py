@@ -0,0 +1,54 @@
+import pytest
+
+# The app module imports its service clients at load time
+for _module in ("streamlit", "pandas", "numpy", "pinecone", "openai", "anthropic", "requests"):
+    pytest.importorskip(_module)
+
+from tennis_coach_webapp import (
+    LEVEL_ADVANCED_CONCEPT,
+    LEVEL_EXPERIENCE,
+    LEVEL_INDICATORS,
+    LEVEL_PHRASE_FLAGS,
+    LEVEL_PHRASE_RE,
+    assess_player_level_from_conversation,
+)
+
+
+def scan_mask(text):
+    mask = 0
+    for match in LEVEL_PHRASE_RE.finditer(text):
+        mask |= LEVEL_PHRASE_FLAGS[match.group(1)]
+    return mask
+
+
+def substring_mask(text):
+    mask = 0
+    for flag, phrases in LEVEL_INDICATORS.items():
+        if any(phrase in text for phrase in phrases):
+            mask |= flag
+    return mask
+
+
+@pytest.mark.parametrize("text", [
+    "i've played beforehand",
+    "no lessons, just with friends on my own",
+    "never had lessons but i play weekly",
+    "i take lessons twice a week and work on my forehand",
+])
+def test_scan_matches_substring_checks(text):
+    assert scan_mask(text) == substring_mask(text)
+
+
+def test_overlapping_phrases_set_both_flags():
+    mask = scan_mask("i've played beforehand")
+    assert mask & LEVEL_EXPERIENCE
+    assert mask & LEVEL_ADVANCED_CONCEPT
+
+
+def test_played_beforehand_is_intermediate():
+    history = [
+        {"role": "user", "content": "Sam"},
+        {"role": "assistant", "content": "Nice to meet you, Sam!"},
+        {"role": "user", "content": "I've played beforehand"},
+    ]
+    assert assess_player_level_from_conversation(history, None) == "Intermediate"